@@ -0,0 +1,58 @@
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from src.report import domain, services
+
+SIZE = 1_000_000
+
+
+def create_wires(size: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    start = pd.Timestamp("2021-01-01").value
+    end = pd.Timestamp("2022-01-01").value
+    return pd.DataFrame({
+        "date": pd.to_datetime(rng.integers(start, end, size), utc=True),
+        "sender": rng.integers(0, 300, size).astype(float),
+        "receiver": rng.integers(0, 300, size).astype(float),
+        "sub1": rng.choice([f"first_{x}" for x in range(0, 50)], size),
+        "sub2": rng.choice([f"second_{x}" for x in range(0, 10)], size),
+        "amount": rng.normal(scale=1_000, size=size).round(2),
+    })
+
+
+def bench(wires: pd.DataFrame, ccols: list[domain.Ccol], interval: domain.Interval, to_sheet: bool = True):
+    start = time.perf_counter()
+    finrep = (
+        services.Finrep(wires, ccols, interval)
+        .validate()
+        .create_report_df()
+        .drop_zero_rows()
+        .drop_zero_cols()
+        .round()
+        .reset_indexes()
+    )
+    middle = time.perf_counter()
+    if not to_sheet:
+        print(f"{len(wires):>9} wires, ccols={ccols}, {finrep.get_report_df().shape}: "
+              f"report_df {(middle - start) * 1_000:.0f}ms, to_sheet skipped")
+        return
+    sheet = finrep.to_sheet()
+    end = time.perf_counter()
+    print(f"{len(wires):>9} wires, ccols={ccols}, {sheet.size}: "
+          f"report_df {(middle - start) * 1_000:.0f}ms, to_sheet {(end - middle) * 1_000:.0f}ms")
+
+
+if __name__ == "__main__":
+    wires = create_wires(SIZE)
+    for freq in ("1M", "7D"):
+        interval = domain.Interval(start_date=datetime(2020, 12, 31, tzinfo=pytz.UTC),
+                                   end_date=datetime(2021, 12, 31, tzinfo=pytz.UTC), freq=freq)
+        bench(wires, ["sender"], interval)
+        bench(wires, ["sender", "sub1"], interval)
+        bench(wires, ["sender", "sub1", "sub2"], interval)
+        # Nearly every wire is its own plan item here, a sheet of ~1M rows is too large to build cell by cell
+        bench(wires, ["sender", "receiver", "sub1", "sub2"], interval, to_sheet=False)
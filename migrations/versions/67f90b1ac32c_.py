@@ -0,0 +1,123 @@
+"""empty message
+
+Revision ID: 67f90b1ac32c
+Revises: 4d0a1ede98ea
+Create Date: 2026-10-19 23:12:41.503318
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+from uuid import UUID, uuid4
+
+from alembic import op
+import pandas as pd
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '67f90b1ac32c'
+down_revision: Union[str, None] = '4d0a1ede98ea'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Plan item keys joined ccol values with no separator, so e.g. (1, "23") and (12, "3") collided.
+# Old keys can't be split back, so plan item counts are recounted from wires and sheet index rows
+# are rebuilt from the index cells of the report sheet.
+KEY_SEP = '\x1f'
+
+report = sa.table(
+    'report',
+    sa.column('id', sa.Uuid),
+    sa.column('source_id', sa.Uuid),
+    sa.column('source_ids', sa.JSON),
+    sa.column('start_date', sa.TIMESTAMP(timezone=True)),
+    sa.column('end_date', sa.TIMESTAMP(timezone=True)),
+    sa.column('freq', sa.String),
+    sa.column('plan_items', sa.JSON),
+    sa.column('sheet_id', sa.String),
+    sa.column('sheet_index', sa.JSON),
+)
+report_plan_item = sa.table(
+    'report_plan_item',
+    sa.column('id', sa.Uuid),
+    sa.column('updated_at', sa.TIMESTAMP(timezone=True)),
+    sa.column('report_id', sa.Uuid),
+    sa.column('key', sa.String),
+    sa.column('count', sa.Integer),
+)
+
+
+def _make_key(values, sep: str) -> str:
+    return sep.join(str(x) for x in values)
+
+
+def _count_plan_items(conn, row) -> dict[str, int]:
+    ccols = row.plan_items['ccols']
+    edges = pd.date_range(row.start_date, row.end_date, freq=row.freq)
+    if len(edges) == 0:
+        return {}
+    source_ids = [UUID(x) for x in row.source_ids] if row.source_ids else [row.source_id]
+    wire = sa.table('wire', sa.column('source_id', sa.Uuid), sa.column('date', sa.TIMESTAMP(timezone=True)),
+                    *[sa.column(x) for x in ccols])
+    keys = [wire.c[x] for x in ccols]
+    stmt = (
+        sa.select(*keys, sa.func.count())
+        .where(wire.c.source_id.in_(source_ids))
+        .where(wire.c.date > edges[0].to_pydatetime())
+        .where(wire.c.date <= edges[-1].to_pydatetime())
+        .group_by(*keys)
+    )
+    return {_make_key(x[:-1], KEY_SEP): x[-1] for x in conn.execute(stmt)}
+
+
+def _index_rows(conn, row) -> dict[str, str]:
+    size = len(row.plan_items['ccols'])
+    stmt = sa.text("""
+        SELECT row_sindex.id, col_sindex.position, cell.value
+        FROM cell
+        JOIN row_sindex ON row_sindex.id = cell.row_sindex_id
+        JOIN col_sindex ON col_sindex.id = cell.col_sindex_id
+        WHERE cell.sheet_id = CAST(:sheet_id AS uuid) AND row_sindex.position > 0 AND col_sindex.position < :size
+        ORDER BY row_sindex.position, col_sindex.position
+    """)
+    values = {}
+    for row_id, _, value in conn.execute(stmt, {"sheet_id": row.sheet_id, "size": size}):
+        values.setdefault(str(row_id), []).append(value)
+    return {_make_key(x, KEY_SEP): row_id for row_id, x in values.items()}
+
+
+def _insert_plan_items(conn, report_id, counts: dict[str, int]):
+    now = datetime.now(timezone.utc)
+    rows = [dict(id=uuid4(), updated_at=now, report_id=report_id, key=k, count=v) for k, v in counts.items()]
+    if rows:
+        conn.execute(report_plan_item.insert(), rows)
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for row in conn.execute(sa.select(report)).all():
+        conn.execute(report_plan_item.delete().where(report_plan_item.c.report_id == row.id))
+        counts = _count_plan_items(conn, row)
+        _insert_plan_items(conn, row.id, counts)
+        if row.sheet_index:
+            sheet_index = dict(row.sheet_index, rows=_index_rows(conn, row))
+            conn.execute(report.update().where(report.c.id == row.id).values(sheet_index=sheet_index))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for row in conn.execute(sa.select(report)).all():
+        old = conn.execute(
+            sa.select(report_plan_item.c.key, report_plan_item.c.count)
+            .where(report_plan_item.c.report_id == row.id)
+        ).all()
+        counts = {}
+        for key, count in old:
+            key = _make_key(key.split(KEY_SEP), '')
+            counts[key] = counts.get(key, 0) + count
+        conn.execute(report_plan_item.delete().where(report_plan_item.c.report_id == row.id))
+        _insert_plan_items(conn, row.id, counts)
+        if row.sheet_index:
+            rows = {_make_key(k.split(KEY_SEP), ''): v for k, v in row.sheet_index['rows'].items()}
+            sheet_index = dict(row.sheet_index, rows=rows)
+            conn.execute(report.update().where(report.c.id == row.id).values(sheet_index=sheet_index))
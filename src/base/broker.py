@@ -1,4 +1,5 @@
 from typing import Iterable, Callable, Type
+from uuid import UUID
 
 from pydantic import BaseModel
 from sqlalchemy import ForeignKey, Column, String, Table, select
@@ -6,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 
 from src.base.repo.postgres import Base
+from src.helpers.arrays import flatten
 
 
 association_table = Table(
@@ -70,6 +72,13 @@ class BrokerRepoPostgres:
         result = [{"id": x.id, "key": x.key} for x in model.subs]
         return result
 
+    async def get_subs_many(self, pubs: Iterable[BaseModel]) -> dict[UUID, list[dict]]:
+        stmt = select(PublisherModel).where(PublisherModel.id.in_(set(x.id for x in pubs)))
+        result = {}
+        for model in (await self._session.scalars(stmt)).unique():
+            result[model.id] = [{"id": x.id, "key": x.key} for x in model.subs]
+        return result
+
     async def get_pubs(self, sub: BaseModel) -> list[dict]:
         stmt = select(SubscriberModel).where(SubscriberModel.id == sub.id)
         model = await self._session.scalar(stmt)
@@ -99,6 +108,12 @@ class Broker:
         subs = await self._repo.get_subs(pub)
         return await self.__get_models(subs)
 
+    async def get_subs_many(self, pubs: Iterable[BaseModel]) -> dict[UUID, list[BaseModel]]:
+        """Subscribers of every publisher; each subscriber is loaded once and shared between its publishers"""
+        subs = await self._repo.get_subs_many(pubs)
+        models = {x.id: x for x in await self.__get_models(flatten(subs.values()))}
+        return {pub_id: [models[x["id"]] for x in ids] for pub_id, ids in subs.items()}
+
     async def get_pubs(self, sub: BaseModel) -> list[BaseModel]:
         pubs = await self._repo.get_pubs(sub)
         return await self.__get_models(pubs)
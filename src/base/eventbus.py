@@ -54,21 +54,47 @@ class Queue:
         for x in events:
             self.append(x)
 
+    def popleft_many(self, key: str) -> list[Event]:
+        events = [x for x in self._queue if x.key == key]
+        self._queue = deque(x for x in self._queue if x.key != key)
+        logger.debug(f"EXTRACT: {key} x {len(events)}")
+        return events
+
     @property
     def empty(self):
         return len(self._queue) == 0
 
 
+def coalesce(events: Sequence[Updated]) -> list[Updated]:
+    """Squash updates of the same entity into one event with the first old and the last actual state"""
+    result: dict[UUID, Updated] = {}
+    for event in events:
+        key = event.actual_entity.id
+        if key in result:
+            result[key] = Updated(key=event.key, old_entity=result[key].old_entity, actual_entity=event.actual_entity)
+        else:
+            result[key] = event
+    return list(result.values())
+
+
 class EventBus:
     def __init__(self, queue: Queue):
         self._queue = queue
         self._handlers: dict[str, Callable] = {}
+        self._batch_handlers: dict[str, Callable] = {}
 
     def register(self, key: str, handler: Callable):
         self._handlers[key] = handler
 
+    def register_batch(self, key: str, handler: Callable):
+        self._batch_handlers[key] = handler
+
     async def run(self):
         while not self._queue.empty:
             event = self._queue.popleft()
-            handler = self._handlers[event.key]
-            await handler(event)
+            if event.key in self._batch_handlers:
+                events = [event] + self._queue.popleft_many(event.key)
+                await self._batch_handlers[event.key](events)
+            else:
+                handler = self._handlers[event.key]
+                await handler(event)
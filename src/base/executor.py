@@ -0,0 +1,53 @@
+import asyncio
+import multiprocessing
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, TypeVar
+
+from src.helpers.decorators import singleton
+
+T = TypeVar("T")
+
+# 0 runs CPU work inline on the event loop, unset uses one worker per core
+WORKERS_ENV = "REPORT_WORKERS"
+
+
+class Executor(ABC):
+    @abstractmethod
+    async def run(self, func: Callable[..., T], *args) -> T:
+        raise NotImplemented
+
+    def shutdown(self):
+        pass
+
+
+class InlineExecutor(Executor):
+    async def run(self, func: Callable[..., T], *args) -> T:
+        return func(*args)
+
+
+class ProcessExecutor(Executor):
+    """Runs module-level functions in a persistent process pool; arguments and results are pickled
+
+    Workers are spawned rather than forked, so they don't inherit the event loop, the open database
+    connections or the threads of the server process.
+    """
+
+    def __init__(self, max_workers: int = None):
+        self._pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, func, *args)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+@singleton
+def get_executor() -> Executor:
+    workers = os.environ.get(WORKERS_ENV)
+    if workers is not None and int(workers) == 0:
+        return InlineExecutor()
+    return ProcessExecutor(max_workers=int(workers) if workers else None)
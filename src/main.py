@@ -6,6 +6,7 @@ from starlette import status
 from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse
 
+from src.base.executor import get_executor
 from src.report.infrastructure.router import router_report, router_source, router_wire
 from src.sheet.infrastructure.router import router_sheet, router_cell
 
@@ -30,6 +31,11 @@ app.include_router(router_sheet)
 app.include_router(router_cell)
 
 
+@app.on_event("shutdown")
+def shutdown_executor():
+    get_executor().shutdown()
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request, exc: RequestValidationError):
     exc_str = f'{exc}'.replace('\n', ' ').replace('   ', ' ')
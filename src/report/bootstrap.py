@@ -1,6 +1,5 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.base.repo.repository import Repository
 from . import services, domain
 from .infrastructure import postgres, subfactory
 from src.sheet.bootstrap import Bootstrap as SheetBootstrap
@@ -12,14 +11,15 @@ from ..base.broker import Broker
 class Bootstrap(SheetBootstrap):
     def __init__(self, session: AsyncSession):
         self._source_repo: services.SourceRepo = postgres.SourceFullRepo(session)
-        self._report_repo: Repository[domain.Report] = postgres.ReportRepo(session)
+        self._report_repo: services.ReportRepo = postgres.ReportRepo(session)
         super().__init__(session)
         self._gw = SheetGatewayAPI(service=self.get_sheet_service(),
                                    report_sheet_service=self.get_report_sheet_service())
         self._subfac = subfactory.ReportSubfac(broker=self.get_broker(),
                                                queue=self._queue,
                                                repo=self._report_repo,
-                                               sheet_gateway=self._gw)
+                                               sheet_gateway=self._gw,
+                                               executor=self._executor)
 
     def get_source_service(self) -> services.SourceService:
         source_service = services.SourceService(repo=self._source_repo, queue=self._queue)
@@ -33,10 +33,12 @@ class Bootstrap(SheetBootstrap):
         bus = super().get_event_bus()
         handler = services.SourceHandler(
             subfac=self._subfac,
-            broker=self.get_broker()
+            broker=self.get_broker(),
+            executor=self._executor,
         )
         bus.register('WiresAppended', handler.handle_wires_appended)
         bus.register('WiresDeleted', handler.handle_wires_deleted)
+        bus.register('WiresUpdated', handler.handle_wires_updated)
         return bus
 
     def get_broker(self) -> Broker:
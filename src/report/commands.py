@@ -1,5 +1,7 @@
+from typing import Iterable, AsyncIterator
 from uuid import UUID, uuid4
 
+import pandas as pd
 from pydantic import BaseModel, ConfigDict, Field
 
 from . import domain, services
@@ -52,14 +54,37 @@ class DeleteSourceById(BaseModel):
         await self.receiver.delete_source_by_id(self.id)
 
 
-class GetUniqueWires(BaseModel):
+class GetPlanItems(BaseModel):
     receiver: services.SourceService
-    fields: list[domain.Ccol]
     source_id: UUID
+    search: str | None = None
+    limit: int | None = None
+    offset: int | None = None
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    async def execute(self) -> list[domain.Wire]:
-        return await self.receiver.get_uniques(self.fields, filter_by={"source_id": self.source_id})
+    async def execute(self) -> list[domain.SourcePlanItem]:
+        return await self.receiver.get_plan_items(self.source_id, self.search, self.limit, self.offset)
+
+
+class GetWireAggregates(BaseModel):
+    source_id: UUID
+    ccols: list[domain.Ccol]
+    interval: domain.Interval
+    receiver: services.SourceService
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    async def execute(self) -> pd.DataFrame:
+        return await self.receiver.get_wire_aggregates(self.source_id, self.ccols, self.interval)
+
+
+class StreamWires(BaseModel):
+    source_id: UUID
+    receiver: services.SourceService
+    chunk_size: int = 100_000
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def execute(self) -> AsyncIterator[domain.WireBatch]:
+        return self.receiver.stream_wires(self.source_id, self.chunk_size)
 
 
 class GetWires(BaseModel):
@@ -74,9 +99,21 @@ class GetWires(BaseModel):
         return await self.receiver.get_wires(self.filter_by, self.order_by, self.slice_from, self.slice_to)
 
 
+class GetWirePage(BaseModel):
+    filter_by: dict
+    receiver: services.SourceService
+    after: domain.WireCursor | None = None
+    limit: int = 1000
+    asc: bool = True
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    async def execute(self) -> tuple[list[domain.Wire], domain.WireCursor | None]:
+        return await self.receiver.get_wire_page(self.filter_by, self.after, self.limit, self.asc)
+
+
 class AppendWires(BaseModel):
     source_info: domain.SourceInfo
-    wires: list[domain.Wire]
+    wires: domain.WireBatch
     receiver: services.SourceService
     id: UUID = Field(default_factory=uuid4)
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -85,9 +122,20 @@ class AppendWires(BaseModel):
         await self.receiver.append_wires(self.source_info, self.wires)
 
 
+class AppendWireChunks(BaseModel):
+    source_info: domain.SourceInfo
+    chunks: Iterable[domain.WireBatch]
+    receiver: services.SourceService
+    id: UUID = Field(default_factory=uuid4)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def execute(self) -> AsyncIterator[int]:
+        return self.receiver.append_wire_chunks(self.source_info, self.chunks)
+
+
 class DeleteWires(BaseModel):
     source_info: domain.SourceInfo
-    wires: list[domain.Wire]
+    wires: domain.WireBatch
     receiver: services.SourceService
     id: UUID = Field(default_factory=uuid4)
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -98,7 +146,7 @@ class DeleteWires(BaseModel):
 
 class UpdateWires(BaseModel):
     source_info: domain.SourceInfo
-    wires: list[domain.Wire]
+    wires: domain.WireBatch
     receiver: services.SourceService
     id: UUID = Field(default_factory=uuid4)
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -107,12 +155,36 @@ class UpdateWires(BaseModel):
         await self.receiver.update_wires(self.source_info, self.wires)
 
 
+class DeleteWiresBy(BaseModel):
+    source_info: domain.SourceInfo
+    wire_filter: domain.WireFilter
+    receiver: services.SourceService
+    id: UUID = Field(default_factory=uuid4)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    async def execute(self) -> int:
+        return await self.receiver.delete_wires_by(self.source_info, self.wire_filter)
+
+
+class UpdateWiresBy(BaseModel):
+    source_info: domain.SourceInfo
+    wire_filter: domain.WireFilter
+    values: domain.WireAssignment
+    receiver: services.SourceService
+    id: UUID = Field(default_factory=uuid4)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    async def execute(self) -> int:
+        return await self.receiver.update_wires_by(self.source_info, self.wire_filter, self.values)
+
+
 class CreateReport(BaseModel):
     title: str
     source: domain.Source
     interval: domain.Interval
     plan_items: domain.PlanItems
     receiver: services.ReportService
+    category: str = "PROFIT"
     id: UUID = Field(default_factory=uuid4)
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -122,6 +194,49 @@ class CreateReport(BaseModel):
             source=self.source,
             plan_items=self.plan_items,
             interval=self.interval,
+            category=self.category,
+        )
+        return report
+
+
+class CreateReportFromAggregates(BaseModel):
+    title: str
+    source_info: domain.SourceInfo
+    aggregates: pd.DataFrame
+    interval: domain.Interval
+    plan_items: domain.PlanItems
+    receiver: services.ReportService
+    category: str = "PROFIT"
+    id: UUID = Field(default_factory=uuid4)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    async def execute(self) -> domain.Report:
+        report = await self.receiver.create_from_aggregates(
+            title=self.title,
+            source_info=self.source_info,
+            aggregates=self.aggregates,
+            plan_items=self.plan_items,
+            interval=self.interval,
+            category=self.category,
+        )
+        return report
+
+
+class CreateConsolidatedReport(BaseModel):
+    title: str
+    aggregates: list[tuple[domain.SourceInfo, pd.DataFrame]]
+    interval: domain.Interval
+    plan_items: domain.PlanItems
+    receiver: services.ReportService
+    id: UUID = Field(default_factory=uuid4)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    async def execute(self) -> domain.Report:
+        report = await self.receiver.create_consolidated(
+            title=self.title,
+            aggregates=self.aggregates,
+            plan_items=self.plan_items,
+            interval=self.interval,
         )
         return report
 
@@ -149,8 +264,18 @@ class GetReportList(BaseModel):
     receiver: services.ReportService
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    async def execute(self) -> list[domain.Report]:
-        return await self.receiver.get_many()
+    async def execute(self) -> list[domain.ReportSummary]:
+        return await self.receiver.get_summaries()
+
+
+class GetCellWireFilter(BaseModel):
+    report_id: UUID
+    cell_id: UUID
+    receiver: services.ReportService
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    async def execute(self) -> dict:
+        return await self.receiver.get_cell_wire_filter(self.report_id, self.cell_id)
 
 
 class DeleteReportById(BaseModel):
@@ -1,3 +1,5 @@
+import base64
+import typing
 from typing import Literal, Union, TypeVar
 
 import numpy as np
@@ -11,6 +13,8 @@ from sortedcontainers import SortedList
 Ccol = Literal['currency', 'sender', 'receiver', 'sub1', 'sub2']
 CellValue = Union[int, float, str, bool, None, datetime]
 CellDtype = Literal["int", "float", "string", "bool", "datetime"]
+# Plan item keys join ccol values with the ASCII unit separator, which account and subconto values never hold
+KEY_SEP = '\x1f'
 
 
 class Cell(BaseModel):
@@ -40,8 +44,10 @@ class SourceInfo(BaseModel):
     title: str
     wcols: list[WcolSchema] = Field(default_factory=wcols_factory)
     id: UUID = Field(default_factory=uuid4)
-    total_start_date: datetime = Field(default_factory=datetime.now)
-    total_end_date: datetime = Field(default_factory=datetime.now)
+    total_start_date: datetime | None = None
+    total_end_date: datetime | None = None
+    wire_count: int = 0
+    total_amount: float = 0
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
     def __hash__(self):
@@ -59,6 +65,134 @@ class Wire(BaseModel):
     id: UUID = Field(default_factory=uuid4)
 
 
+class WireBatch:
+    """Wires held column-wise in a frame, validated per column instead of per wire
+
+    A row may stand for several wires summed together, 'count' says how many.
+    """
+    columns = ['id', 'date', 'sender', 'receiver', 'amount', 'sub1', 'sub2', 'source_id']
+
+    def __init__(self, frame: pd.DataFrame):
+        self._frame = frame
+
+    def __len__(self):
+        return len(self._frame)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, source_id: UUID = None) -> 'WireBatch':
+        missing = {'date', 'sender', 'receiver', 'amount'}.difference(frame.columns)
+        if source_id is None and 'source_id' not in frame.columns:
+            missing.add('source_id')
+        if missing:
+            raise ValueError(f"wires have no {sorted(missing)} columns")
+
+        frame = frame.copy()
+        if source_id is not None:
+            frame['source_id'] = source_id
+        if 'id' not in frame.columns:
+            frame['id'] = [uuid4() for _ in range(len(frame))]
+        for col in ['sub1', 'sub2']:
+            frame[col] = frame[col].fillna('').astype(str) if col in frame.columns else ''
+        frame['date'] = pd.to_datetime(frame['date'], utc=True).astype('datetime64[ns, UTC]')
+        for col in ['sender', 'receiver', 'amount']:
+            frame[col] = pd.to_numeric(frame[col]).astype(np.float64)
+        frame['count'] = frame['count'].astype(np.int64) if 'count' in frame.columns else 1
+
+        nans = frame[cls.columns].isna().sum()
+        if nans.sum() != 0:
+            raise ValueError(f"wires have empty values: {nans[nans != 0].to_dict()}")
+        return cls(frame[[*cls.columns, 'count']].reset_index(drop=True))
+
+    @classmethod
+    def from_wires(cls, wires: list[Wire]) -> 'WireBatch':
+        return cls.from_frame(pd.DataFrame([x.model_dump() for x in wires], columns=cls.columns))
+
+    def to_frame(self) -> pd.DataFrame:
+        return self._frame
+
+    def to_rows(self, columns: list[str] = None) -> list[tuple]:
+        columns = self.columns if columns is None else columns
+        data = [
+            list(self._frame[col].dt.to_pydatetime()) if col == 'date' else self._frame[col].tolist()
+            for col in columns
+        ]
+        return list(zip(*data))
+
+    @property
+    def ids(self) -> list[UUID]:
+        return self._frame['id'].tolist()
+
+    @property
+    def count(self) -> int:
+        return int(self._frame['count'].sum())
+
+
+class WireDictionary:
+    """Integer codes of the accounts or the subcontos of one source; wires store codes instead of values
+
+    Codes are handed out in order of first appearance and never reused, so a dictionary only grows.
+    """
+
+    def __init__(self, codes: dict = None):
+        self.codes = {} if codes is None else codes
+
+    def encode(self, values: pd.Series) -> tuple[np.ndarray, dict]:
+        """Returns the code of every value and the entries added for values seen for the first time"""
+        added = {}
+        for value in pd.unique(values):
+            if value not in self.codes:
+                added[value] = self.codes[value] = len(self.codes)
+        return values.map(self.codes).to_numpy(dtype=np.int64), added
+
+
+class SourcePlanItem(BaseModel):
+    sender: float
+    receiver: float
+    sub1: str
+    sub2: str
+    amount: float
+    count: int
+
+
+class WireFilter(BaseModel):
+    source_id: UUID
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+    sender: float | None = None
+    receiver: float | None = None
+    sub1: str | None = None
+    sub2: str | None = None
+
+
+class WireAssignment(BaseModel):
+    date: datetime | None = None
+    sender: float | None = None
+    receiver: float | None = None
+    amount: float | None = None
+    sub1: str | None = None
+    sub2: str | None = None
+
+    def to_values(self) -> dict:
+        return self.model_dump(exclude_none=True)
+
+
+class WireCursor(BaseModel):
+    """Position of the last wire of a page; wires are paged by (date, id)"""
+    date: datetime
+    id: UUID
+
+    @classmethod
+    def from_wire(cls, wire: Wire) -> 'WireCursor':
+        return cls(date=wire.date, id=wire.id)
+
+    @classmethod
+    def decode(cls, token: str) -> 'WireCursor':
+        return cls.model_validate_json(base64.urlsafe_b64decode(token.encode()))
+
+    def encode(self) -> str:
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode()
+
+
 class Source(BaseModel):
     source_info: SourceInfo
     wires: list[Wire] = Field(default_factory=list)
@@ -81,6 +215,68 @@ class PlanItems(BaseModel):
             "order": list(self.order),
         }
 
+    @staticmethod
+    def make_key(values: typing.Iterable) -> str:
+        return KEY_SEP.join(str(x) for x in values)
+
+    def add_counts(self, counts: dict[str, int]):
+        # New keys are inserted into order and exhausted keys removed, both in O(log n)
+        for key, count in counts.items():
+            total = self.uniques.get(key, 0) + count
+            if total > 0:
+                if key not in self.uniques:
+                    self.order.add(key)
+                self.uniques[key] = total
+            elif key in self.uniques:
+                del self.uniques[key]
+                self.order.remove(key)
+
+    def count_keys(self, frame: pd.DataFrame) -> dict[str, int]:
+        # Counts are summed per integer code; key strings are built once per distinct key, not per wire
+        codes, index = encode_keys(frame, self.ccols)
+        counts = np.bincount(codes, weights=frame['count'].to_numpy(dtype=np.float64), minlength=len(index))
+        keys = [self.make_key(x if isinstance(x, tuple) else (x,)) for x in index]
+        return dict(zip(keys, counts.astype(np.int64).tolist()))
+
+
+def encode_keys(frame: pd.DataFrame, ccols: list[Ccol]) -> tuple[np.ndarray, pd.Index]:
+    """Dictionary-encodes the ccols of every row into one integer code, sorted by key.
+
+    Returns the codes and an index holding the decoded key of every code.
+    """
+    codes = np.zeros(len(frame), dtype=np.int64)
+    levels, steps = [], []
+    for ccol in ccols:
+        level_codes, level = pd.factorize(frame[ccol], sort=True)
+        # Re-factorized after every level, so the combined code stays below the row count instead of
+        # growing with the product of all level sizes and overflowing int64
+        codes, uniques = pd.factorize(codes * len(level) + level_codes, sort=True)
+        levels.append(level)
+        steps.append(uniques)
+    return codes, _decode_keys(steps, levels, ccols)
+
+
+def _decode_keys(steps: list[np.ndarray], levels: list[pd.Index], ccols: list[Ccol]) -> pd.Index:
+    # steps[i] maps a code after level i back to (code after level i - 1) * len(levels[i]) + level code
+    level_codes = []
+    rest = np.arange(len(steps[-1]))
+    for level, uniques in zip(reversed(levels), reversed(steps)):
+        rest, codes = np.divmod(uniques[rest], len(level))
+        level_codes.insert(0, codes)
+    if len(levels) == 1:
+        return pd.Index(levels[0].take(level_codes[0]), name=ccols[0])
+    return pd.MultiIndex(levels=levels, codes=level_codes, names=ccols)
+
+
+class SheetIndex(BaseModel):
+    # Where the report sheet keeps each plan item (row) and period (col)
+    rows: dict[str, UUID] = Field(default_factory=dict)
+    cols: dict[str, UUID] = Field(default_factory=dict)
+
+    @staticmethod
+    def make_period_key(date: datetime) -> str:
+        return pd.Timestamp(date).isoformat()
+
 
 class Period(BaseModel):
     from_date: datetime
@@ -102,6 +298,19 @@ class SheetInfo(BaseModel):
     id: UUID
 
 
+class ReportSummary(BaseModel):
+    """Report without plan items and sheet index, for listings"""
+    title: str
+    category: str
+    source_info: SourceInfo
+    sheet_info: SheetInfo
+    interval: Interval
+    source_ids: list[UUID] = Field(default_factory=list)
+    linked_sheets: list[SheetInfo] = Field(default_factory=list)
+    updated_at: datetime = Field(default_factory=datetime.now)
+    id: UUID = Field(default_factory=uuid4)
+
+
 class Report(BaseModel):
     title: str
     category: str
@@ -109,7 +318,10 @@ class Report(BaseModel):
     sheet_info: SheetInfo
     interval: Interval
     plan_items: PlanItems
+    # Member sources of a consolidated report, source_info is the first of them; empty for one source
+    source_ids: list[UUID] = Field(default_factory=list)
     linked_sheets: list[SheetInfo] = Field(default_factory=list)
+    sheet_index: SheetIndex | None = Field(default=None, exclude=True)
     updated_at: datetime = Field(default_factory=datetime.now)
     id: UUID = Field(default_factory=uuid4)
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -117,6 +329,11 @@ class Report(BaseModel):
     def __hash__(self):
         return self.id.__hash__()
 
+    @property
+    def cumulative(self) -> bool:
+        # Balance columns are running totals of the period flows
+        return self.category == "BALANCE"
+
     def find_col_pos(self, date: datetime) -> int:
         for j, period in enumerate(self.periods, start=len(self.plan_items.ccols)):
             if period.from_date <= date <= period.to_date:
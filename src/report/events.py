@@ -1,6 +1,6 @@
 from uuid import UUID, uuid4
 
-from pydantic import Field
+from pydantic import Field, ConfigDict
 
 from src.base.eventbus import Event
 from . import domain
@@ -8,18 +8,21 @@ from . import domain
 
 class WiresAppended(Event):
     source_info: domain.SourceInfo
-    wires: list[domain.Wire]
+    wires: domain.WireBatch
     id: UUID = Field(default_factory=uuid4)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
 class WiresDeleted(Event):
     source_info: domain.SourceInfo
-    wires: list[domain.Wire]
+    wires: domain.WireBatch
     id: UUID = Field(default_factory=uuid4)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
 
 
 class WiresUpdated(Event):
     source_info: domain.SourceInfo
-    old_values: list[domain.Wire]
-    new_values: list[domain.Wire]
+    old_values: domain.WireBatch
+    new_values: domain.WireBatch
     id: UUID = Field(default_factory=uuid4)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
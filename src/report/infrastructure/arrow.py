@@ -0,0 +1,77 @@
+import io
+from typing import Iterator, AsyncIterator, BinaryIO, Literal
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .. import domain
+
+WireFormat = Literal["parquet", "arrow"]
+
+MEDIA_TYPES: dict[WireFormat, str] = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+WIRE_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("date", pa.timestamp("us", tz="UTC")),
+    ("sender", pa.float64()),
+    ("receiver", pa.float64()),
+    ("amount", pa.float64()),
+    ("sub1", pa.string()),
+    ("sub2", pa.string()),
+])
+
+BATCH_SIZE = 100_000
+
+
+def read_wire_batches(file: BinaryIO, fmt: WireFormat, source_id: UUID) -> Iterator[domain.WireBatch]:
+    # Imported wires always get new ids, so an export can be loaded into another source
+    if fmt == "parquet":
+        batches = pq.ParquetFile(file).iter_batches(batch_size=BATCH_SIZE)
+    else:
+        batches = pa.ipc.open_stream(file)
+    for batch in batches:
+        df = batch.to_pandas()
+        if 'amount' not in df.columns:
+            df['amount'] = df['debit'] - df['credit']
+        columns = [x for x in ['date', 'sender', 'receiver', 'amount', 'sub1', 'sub2'] if x in df.columns]
+        yield domain.WireBatch.from_frame(df[columns], source_id=source_id)
+
+
+async def write_wire_batches(batches: AsyncIterator[domain.WireBatch], fmt: WireFormat) -> AsyncIterator[bytes]:
+    """Encodes every wire batch as one parquet row group or arrow record batch as soon as it arrives"""
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, WIRE_SCHEMA) if fmt == "parquet" else pa.ipc.new_stream(sink, WIRE_SCHEMA)
+    async for batch in batches:
+        df = batch.to_frame().assign(id=lambda x: x['id'].astype(str))
+        table = pa.Table.from_pandas(df[WIRE_SCHEMA.names], schema=WIRE_SCHEMA, preserve_index=False)
+        writer.write_table(table)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+class _Sink(io.RawIOBase):
+    # Keeps counting positions after a drain because parquet footers refer to absolute offsets
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
@@ -14,6 +14,9 @@ class SheetGatewayAPI(SheetGateway):
     async def get_sheet_by_id(self, sheet_id: UUID) -> sheet_domain.Sheet:
         return await self._sheet_service.get_sheet_by_id(sheet_id)
 
+    async def get_row_of_cell(self, sheet_id: UUID, cell_id: UUID) -> list[sheet_domain.Cell]:
+        return await self._sheet_service.get_row_of_cell(sheet_id, cell_id)
+
     async def create_sheet(self, sheet: sheet_domain.Sheet = None) -> UUID:
         sheet = await self._sheet_service.create_sheet(sheet)
         return sheet.sf.id
@@ -25,5 +28,9 @@ class SheetGatewayAPI(SheetGateway):
     async def update_sheet(self, data: sheet_domain.Sheet):
         await self._sheet_service.update_sheet(data)
 
-    async def merge_sheets(self, target_sheet_id: UUID, data: sheet_domain.Sheet, merge_on: list[int]):
-        await self._sheet_service.complex_merge(target_sheet_id, data, merge_on, merge_on)
+    async def merge_sheets(self, target_sheet_id: UUID, data: sheet_domain.Sheet,
+                           merge_on: list[int]) -> sheet_domain.Sheet:
+        return await self._sheet_service.complex_merge(target_sheet_id, data, merge_on, merge_on)
+
+    async def increment_cells(self, sheet_id: UUID, deltas: list[tuple[UUID, UUID, float]]):
+        await self._sheet_service.increment_cells(sheet_id, deltas)
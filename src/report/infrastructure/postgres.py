@@ -1,11 +1,18 @@
-from typing import Type
-from uuid import UUID
+from datetime import datetime, timezone
+from typing import Type, AsyncIterator
+from uuid import UUID, uuid4
 
+import numpy as np
+import pandas as pd
 from sortedcontainers import SortedList
-from sqlalchemy import String, TIMESTAMP, func, Float, ForeignKey, select, JSON
+from sqlalchemy import String, TIMESTAMP, func, Float, ForeignKey, select, JSON, values, column, and_, Integer, \
+    UniqueConstraint, delete, update, literal, union_all, tuple_, Uuid, Index, \
+    or_, cast
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, defer
 
+from src import helpers
 from src.core import OrderBy
 from src.base.repo.postgres import Base, PostgresRepo
 from src.base.repo.repository import Repository
@@ -16,11 +23,23 @@ from src.report import domain, services
 class SourceInfoModel(Base):
     __tablename__ = "source"
     title: Mapped[str] = mapped_column(String(32), nullable=False)
+    # Statistics are maintained by SourceFullRepo.increment_wire_aggregates and never written from the entity
+    total_start_date: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    total_end_date: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    wire_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_amount: Mapped[float] = mapped_column(Float, nullable=False, default=0)
     wires = relationship('WireModel')
     reports = relationship('ReportModel')
 
     def to_entity(self) -> domain.SourceInfo:
-        return domain.SourceInfo(id=self.id, title=self.title)
+        return domain.SourceInfo(
+            id=self.id,
+            title=self.title,
+            total_start_date=self.total_start_date,
+            total_end_date=self.total_end_date,
+            wire_count=self.wire_count,
+            total_amount=self.total_amount,
+        )
 
     @classmethod
     def from_entity(cls, entity: domain.SourceInfo):
@@ -32,37 +51,80 @@ class SourceInfoModel(Base):
 
 class WireModel(Base):
     __tablename__ = "wire"
+    __table_args__ = (
+        Index("ix_wire_source_id_date_id", "source_id", "date", "id"),
+        Index("ix_wire_source_id_codes_date",
+              "source_id", "sender_code", "receiver_code", "sub1_code", "sub2_code", "date"),
+    )
     date: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP(timezone=True), default=func.now())
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    # Accounts and subcontos are stored as codes of the source_account and source_subconto dictionaries
+    sender_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    receiver_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    sub1_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    sub2_code: Mapped[int] = mapped_column(Integer, nullable=False)
+    source_id: Mapped[UUID] = mapped_column(ForeignKey("source.id"))
+
+
+class SourceAccountModel(Base):
+    __tablename__ = "source_account"
+    __table_args__ = (UniqueConstraint("source_id", "value"), UniqueConstraint("source_id", "code"))
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+    code: Mapped[int] = mapped_column(Integer, nullable=False)
+    source_id: Mapped[UUID] = mapped_column(ForeignKey("source.id", ondelete="CASCADE"))
+
+
+class SourceSubcontoModel(Base):
+    __tablename__ = "source_subconto"
+    __table_args__ = (UniqueConstraint("source_id", "value"), UniqueConstraint("source_id", "code"))
+    value: Mapped[str] = mapped_column(String(1024), nullable=False)
+    code: Mapped[int] = mapped_column(Integer, nullable=False)
+    source_id: Mapped[UUID] = mapped_column(ForeignKey("source.id", ondelete="CASCADE"))
+
+
+# Senders and receivers share the account dictionary, sub1 and sub2 the subconto one
+_WIRE_DICTIONARIES: dict[str, Type[Base]] = {
+    'sender': SourceAccountModel,
+    'receiver': SourceAccountModel,
+    'sub1': SourceSubcontoModel,
+    'sub2': SourceSubcontoModel,
+}
+
+
+class WireAggregateModel(Base):
+    # Wires summed per UTC day; a day covers (day - 1 day, day], the same right-closed bins as Finrep
+    __tablename__ = "wire_aggregate"
+    __table_args__ = (UniqueConstraint("source_id", "day", "sender", "receiver", "sub1", "sub2"),)
+    day: Mapped[TIMESTAMP] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
     sender: Mapped[float] = mapped_column(Float, nullable=False)
     receiver: Mapped[float] = mapped_column(Float, nullable=False)
+    sub1: Mapped[str] = mapped_column(String(1024), nullable=False)
+    sub2: Mapped[str] = mapped_column(String(1024), nullable=False)
     amount: Mapped[float] = mapped_column(Float, nullable=False)
-    sub1: Mapped[str] = mapped_column(String(1024), default="")
-    sub2: Mapped[str] = mapped_column(String(1024), default="")
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
     source_id: Mapped[UUID] = mapped_column(ForeignKey("source.id"))
 
-    def to_entity(self, source_info: domain.SourceInfo) -> domain.Wire:
-        return domain.Wire(
-            id=self.id,
+
+class SourcePlanItemModel(Base):
+    # Distinct (sender, receiver, sub1, sub2) of a source, kept up to date alongside wire_aggregate
+    __tablename__ = "source_plan_item"
+    __table_args__ = (UniqueConstraint("source_id", "sender", "receiver", "sub1", "sub2"),)
+    sender: Mapped[float] = mapped_column(Float, nullable=False)
+    receiver: Mapped[float] = mapped_column(Float, nullable=False)
+    sub1: Mapped[str] = mapped_column(String(1024), nullable=False)
+    sub2: Mapped[str] = mapped_column(String(1024), nullable=False)
+    amount: Mapped[float] = mapped_column(Float, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    source_id: Mapped[UUID] = mapped_column(ForeignKey("source.id"))
+
+    def to_entity(self) -> domain.SourcePlanItem:
+        return domain.SourcePlanItem(
             sender=self.sender,
             receiver=self.receiver,
-            amount=self.amount,
             sub1=self.sub1,
             sub2=self.sub2,
-            date=self.date,
-            source_id=self.source_id,
-        )
-
-    @classmethod
-    def from_entity(cls, entity: domain.Wire):
-        return cls(
-            id=entity.id,
-            sender=entity.sender,
-            receiver=entity.receiver,
-            amount=entity.amount,
-            sub1=entity.sub1,
-            sub2=entity.sub2,
-            date=entity.date,
-            source_id=entity.source_id,
+            amount=self.amount,
+            count=self.count,
         )
 
 
@@ -75,89 +137,132 @@ class ReportModel(Base):
     plan_items: Mapped[JSON] = mapped_column(JSON, nullable=False)
     sheet_id: Mapped[UUID] = mapped_column(String(64), nullable=False)
     linked_sheets: Mapped[JSON] = mapped_column(JSON, nullable=False)
+    sheet_index: Mapped[JSON] = mapped_column(JSON, nullable=True)
+    category: Mapped[str] = mapped_column(String(16), nullable=False, default="PROFIT")
+    source_ids: Mapped[JSON] = mapped_column(JSON, nullable=True)
     source_id: Mapped[UUID] = mapped_column(ForeignKey("source.id"))
 
     def to_entity(self) -> domain.Report:
         raise NotImplemented
 
     @staticmethod
-    def to_entity_from_tuple(data) -> domain.Report:
+    def to_entity_from_tuple(data, uniques: dict[str, int] = None) -> domain.Report:
         report_model: ReportModel = data[0]
         source_info_model: SourceInfoModel = data[1]
+        uniques = {} if uniques is None else uniques
         pl = domain.PlanItems(
             ccols=report_model.plan_items.get('ccols'),
-            uniques=report_model.plan_items.get('uniques'),
-            order=SortedList(report_model.plan_items.get('order')),
+            uniques=uniques,
+            order=SortedList(uniques),
         )
         return domain.Report(
             title=report_model.title,
-            category="PROFIT",
+            category=report_model.category,
             id=report_model.id,
             plan_items=pl,
+            source_ids=report_model.source_ids or [],
             source_info=source_info_model.to_entity(),
             sheet_info=domain.SheetInfo(id=report_model.sheet_id),
             interval=domain.Interval(start_date=report_model.start_date, end_date=report_model.end_date,
                                      freq=report_model.freq),
-            linked_sheets=[domain.SheetInfo(id=x) for x in report_model.linked_sheets]
+            linked_sheets=[domain.SheetInfo(id=x) for x in report_model.linked_sheets],
+            sheet_index=domain.SheetIndex(**report_model.sheet_index) if report_model.sheet_index else None,
+        )
+
+    def to_summary(self, source_info_model: SourceInfoModel) -> domain.ReportSummary:
+        return domain.ReportSummary(
+            title=self.title,
+            category=self.category,
+            id=self.id,
+            source_ids=self.source_ids or [],
+            source_info=source_info_model.to_entity(),
+            sheet_info=domain.SheetInfo(id=self.sheet_id),
+            interval=domain.Interval(start_date=self.start_date, end_date=self.end_date, freq=self.freq),
+            linked_sheets=[domain.SheetInfo(id=x) for x in self.linked_sheets],
+            updated_at=self.updated_at,
         )
 
     @classmethod
     def from_entity(cls, entity: domain.Report):
         return cls(
             title=entity.title,
+            category=entity.category,
             id=entity.id,
-            plan_items=entity.plan_items.model_dump(),
+            plan_items={"ccols": entity.plan_items.ccols},
             sheet_id=str(entity.sheet_info.id),
             source_id=entity.source_info.id,
             **entity.interval.model_dump(),
             linked_sheets=list(str(x.id) for x in entity.linked_sheets),
+            source_ids=[str(x) for x in entity.source_ids] or None,
+            sheet_index=entity.sheet_index.model_dump(mode='json') if entity.sheet_index else None,
         )
 
 
+class ReportPlanItemModel(Base):
+    # Plan item counts of a report live here, so wire events write only the keys they touch
+    __tablename__ = "report_plan_item"
+    __table_args__ = (UniqueConstraint("report_id", "key"),)
+    key: Mapped[str] = mapped_column(String(4096), nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False)
+    report_id: Mapped[UUID] = mapped_column(ForeignKey("report.id", ondelete="CASCADE"))
+
+
 class SourceInfoRepo(PostgresRepo):
     def __init__(self, session: AsyncSession, model: Type[Base] = SourceInfoModel):
         super().__init__(session, model)
 
 
 class WireRepo(PostgresRepo):
+    # Wires are read through _select_wires, which decodes the dictionary codes back to values
     def __init__(self, session: AsyncSession, model: Type[Base] = WireModel):
         super().__init__(session, model)
 
-    async def get_one_by_id(self, uuid: UUID) -> domain.Wire:
+    async def add_many(self, data: list[domain.Wire]):
         raise NotImplemented
 
-    async def get_many_by_id(self, ids: list[UUID], order_by: OrderBy = None) -> list[domain.Wire]:
-        stmt = (
-            select(WireModel, SourceInfoModel)
-            .join(SourceInfoModel, WireModel.source_id == SourceInfoModel.id)
-            .where(WireModel.id.in_(ids))
-        )
-        result = await self._session.execute(stmt)
-        entities = [x[0].to_entity(source_info=x[1].to_entity()) for x in result]
-        return entities
+    async def get_one_by_id(self, uuid: UUID) -> domain.Wire:
+        raise NotImplemented
 
     async def get_many(self, filter_by: dict = None, order_by: OrderBy = None,
                        slice_from=None, slice_to=None) -> list[domain.Wire]:
-        stmt = (
-            select(WireModel, SourceInfoModel)
-            .join(SourceInfoModel, WireModel.source_id == SourceInfoModel.id)
-        )
-        stmt = self._expand_statement(stmt, filter_by, order_by, slice_from, slice_to)
+        stmt = _select_wires(*_parse_wire_filter_by(filter_by or {}))
+        if order_by is not None:
+            stmt = stmt.order_by(*_parse_wire_order_by(stmt, order_by))
+        if slice_from is not None and slice_to is not None:
+            stmt = stmt.slice(slice_from, slice_to)
         result = await self._session.execute(stmt)
-        entities = [x[0].to_entity(source_info=x[1].to_entity()) for x in result]
-        return entities
+        return [domain.Wire(**x) for x in result.mappings()]
+
+    async def get_many_by_id(self, ids: list[UUID], order_by: OrderBy = None) -> list[domain.Wire]:
+        return await self.get_many({"id.__in": ids}, order_by)
+
+    async def get_page(self, filter_by: dict, after: domain.WireCursor = None, limit: int = 1000,
+                       asc: bool = True) -> list[domain.Wire]:
+        # Row comparison on (date, id) walks the (source_id, date, id) index instead of skipping OFFSET rows
+        table = WireModel.__table__
+        stmt = _select_wires(*_parse_wire_filter_by(filter_by))
+        key = tuple_(table.c.date, table.c.id)
+        if after is not None:
+            cursor = tuple_(literal(after.date, TIMESTAMP(timezone=True)), literal(after.id, Uuid))
+            stmt = stmt.where(key > cursor if asc else key < cursor)
+        if asc:
+            stmt = stmt.order_by(table.c.date, table.c.id)
+        else:
+            stmt = stmt.order_by(table.c.date.desc(), table.c.id.desc())
+        result = await self._session.execute(stmt.limit(limit))
+        return [domain.Wire(**x) for x in result.mappings()]
 
     async def get_uniques(self, columns_by: list[str], filter_by: dict = None,
                           order_by: OrderBy = None) -> list[domain.Wire]:
-        stmt = (
-            select(WireModel, SourceInfoModel)
-            .join(SourceInfoModel, WireModel.source_id == SourceInfoModel.id)
-            .distinct(*[self._model.__table__.c[col] for col in columns_by])
-        )
-        stmt = self._expand_statement(stmt, filter_by, order_by)
+        stmt = _select_wires(*_parse_wire_filter_by(filter_by or {}))
+        stmt = stmt.distinct(*[stmt.selected_columns[col] for col in columns_by])
+        if order_by is not None:
+            stmt = stmt.order_by(*_parse_wire_order_by(stmt, order_by))
         result = await self._session.execute(stmt)
-        entities = [x[0].to_entity(source_info=x[1].to_entity()) for x in result]
-        return entities
+        return [domain.Wire(**x) for x in result.mappings()]
+
+    async def remove_many(self, filter_by: dict):
+        await self._session.execute(delete(WireModel.__table__).where(*_parse_wire_filter_by(filter_by)))
 
 
 class SourceFullRepo(services.SourceRepo):
@@ -165,6 +270,7 @@ class SourceFullRepo(services.SourceRepo):
         self._source_info_repo = SourceInfoRepo(session)
         self._wire_repo = WireRepo(session)
         self._session = session
+        self._dictionaries: dict[tuple[UUID, Type[Base]], domain.WireDictionary] = {}
 
     @property
     def source_info_repo(self) -> Repository[domain.SourceInfo]:
@@ -176,31 +282,336 @@ class SourceFullRepo(services.SourceRepo):
 
     async def add_source(self, source: domain.Source):
         await self.source_info_repo.add_many([source.source_info])
-        await self.wire_repo.add_many(source.wires)
+        if source.wires:
+            await self._session.flush()
+            await self.add_wires(domain.WireBatch.from_wires(source.wires))
 
     async def get_source_by_id(self, uuid: UUID) -> domain.Source:
-        stmt = (select(SourceInfoModel, WireModel)
-                .join(WireModel, WireModel.source_id == SourceInfoModel.id)
-                .where(SourceInfoModel.id == uuid)
-                )
+        source_info = await self._session.scalar(select(SourceInfoModel).where(SourceInfoModel.id == uuid))
+        result = await self._session.execute(_select_wires(WireModel.__table__.c.source_id == uuid))
+        return domain.Source(source_info=source_info.to_entity(), wires=[domain.Wire(**x) for x in result.mappings()])
+
+    async def _get_dictionary(self, source_id: UUID, model: Type[Base]) -> domain.WireDictionary:
+        key = (source_id, model)
+        if key not in self._dictionaries:
+            # The source row stays locked until commit, so concurrent imports can't hand out the same code
+            await self._session.execute(select(SourceInfoModel.id).where(SourceInfoModel.id == source_id)
+                                        .with_for_update())
+            table = model.__table__
+            result = await self._session.execute(select(table.c.value, table.c.code)
+                                                 .where(table.c.source_id == source_id))
+            self._dictionaries[key] = domain.WireDictionary(dict(result.tuples().all()))
+        return self._dictionaries[key]
+
+    async def _encode(self, source_id: UUID, col: str, values: pd.Series) -> np.ndarray:
+        model = _WIRE_DICTIONARIES[col]
+        codes, added = (await self._get_dictionary(source_id, model)).encode(values)
+        if added:
+            rows = [dict(id=uuid4(), source_id=source_id, value=k.item() if isinstance(k, np.generic) else k, code=v)
+                    for k, v in added.items()]
+            await self._session.execute(insert(model.__table__), rows)
+        return codes
+
+    async def get_wire_aggregates(self, source_id: UUID, ccols: list[domain.Ccol],
+                                  interval: domain.Interval) -> pd.DataFrame:
+        edges = interval.to_date_range()
+        if len(edges) < 2:
+            return _aggregate_frame([], ccols)
+
+        if all(_is_utc_midnight(x) for x in edges):
+            table = WireAggregateModel.__table__
+            date, count = table.c.day, func.sum(table.c.count)
+            keys = [table.c[ccol] for ccol in ccols]
+        else:
+            table = WireModel.__table__
+            date, count = table.c.date, func.count()
+            keys = [table.c.source_id, *[table.c[f'{ccol}_code'] for ccol in ccols]]
+
+        # Period k covers (edges[k], edges[k + 1]] and is labeled by its right edge, as in Finrep
+        periods = (
+            values(column("from_date", TIMESTAMP(timezone=True)), column("to_date", TIMESTAMP(timezone=True)),
+                   name="period")
+            .data(list(zip(edges[:-1], edges[1:])))
+        )
+        stmt = (
+            select(*keys, periods.c.to_date.label('date'),
+                   func.sum(table.c.amount).label('amount'), count.label('count'))
+            .join_from(table, periods, and_(date > periods.c.from_date, date <= periods.c.to_date))
+            .where(table.c.source_id == source_id, date > edges[0], date <= edges[-1])
+            .group_by(*keys, periods.c.to_date)
+        )
+        if table is WireModel.__table__:
+            # Wires are grouped on their codes, only the distinct keys are decoded
+            grouped = stmt.subquery('grouped')
+            joined, decoded = _join_dictionaries(grouped, ccols)
+            stmt = (
+                select(*decoded.values(), grouped.c.date, grouped.c.amount, grouped.c.count)
+                .select_from(joined)
+            )
         result = await self._session.execute(stmt)
-        result = list(result)
+        return _aggregate_frame(result.all(), ccols)
+
+    async def add_wires(self, wires: domain.WireBatch):
+        if len(wires) == 0:
+            return
+        frame = wires.to_frame()
+        codes = np.zeros((len(frame), len(_WIRE_DICTIONARIES)), dtype=np.int64)
+        for source_id, rows in frame.groupby('source_id', sort=False).indices.items():
+            for j, col in enumerate(_WIRE_DICTIONARIES):
+                codes[rows, j] = await self._encode(source_id, col, frame[col].iloc[rows])
+
+        # COPY runs on the session's own connection, so it belongs to the current transaction
+        connection = await self._session.connection()
+        raw = await connection.get_raw_connection()
+        now = datetime.now(timezone.utc)
+        await raw.driver_connection.copy_records_to_table(
+            WireModel.__tablename__,
+            records=[(*x, *y, now) for x, y in zip(wires.to_rows(_WIRE_VALUES), codes.tolist())],
+            columns=[*_WIRE_VALUES, *_WIRE_CODES, 'updated_at'],
+        )
 
-        if len(result) == 0:
-            stmt = select(SourceInfoModel).where(SourceInfoModel.id == uuid)
-            result = await self._session.scalar(stmt)
-            source_info = result.to_entity()
-            return domain.Source(source_info=source_info)
-        else:
-            source_info = result[0][0].to_entity()
-            wires = [x[1].to_entity(source_info=source_info) for x in result]
-            return domain.Source(source_info=source_info, wires=wires)
+    async def stream_wires(self, source_id: UUID, chunk_size: int) -> AsyncIterator[domain.WireBatch]:
+        table = WireModel.__table__
+        stmt = (
+            _select_wires(table.c.source_id == source_id)
+            .order_by(table.c.date, table.c.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        result = await self._session.stream(stmt)
+        async for rows in result.partitions():
+            yield domain.WireBatch.from_frame(pd.DataFrame(rows, columns=domain.WireBatch.columns))
+
+    async def delete_wires_by(self, wire_filter: domain.WireFilter) -> domain.WireBatch:
+        table = WireModel.__table__
+        fields = ['source_id', 'date', *_WIRE_CODES]
+        deleted = (
+            delete(table)
+            .where(*_parse_wire_filter(wire_filter))
+            .returning(*[table.c[x] for x in fields], table.c.amount)
+            .cte('deleted')
+        )
+        keys = [deleted.c[x] for x in fields]
+        grouped = (
+            select(*keys, func.sum(deleted.c.amount).label('amount'), func.count().label('count'))
+            .group_by(*keys)
+            .subquery('grouped')
+        )
+        result = await self._session.execute(_select_decoded_sums(grouped))
+        return domain.WireBatch.from_frame(pd.DataFrame(result.all(), columns=[*_WIRE_KEYS, 'amount', 'count']))
+
+    async def update_wires_by(self, wire_filter: domain.WireFilter,
+                              values: domain.WireAssignment) -> tuple[domain.WireBatch, domain.WireBatch]:
+        table = WireModel.__table__
+        fields = ['source_id', 'date', *_WIRE_CODES, 'amount']
+        assigned = values.to_values()
+        for col in _WIRE_DICTIONARIES:
+            if col in assigned:
+                codes = await self._encode(wire_filter.source_id, col, pd.Series([assigned.pop(col)]))
+                assigned[f'{col}_code'] = int(codes[0])
+        target = select(table.c.id, *[table.c[x] for x in fields]).where(*_parse_wire_filter(wire_filter)).cte('target')
+        changed = (
+            update(table)
+            .where(table.c.id == target.c.id)
+            .values(**assigned, updated_at=func.now())
+            .returning(*[target.c[x].label(f'old_{x}') for x in fields],
+                       *[table.c[x].label(f'new_{x}') for x in fields])
+            .cte('changed')
+        )
+        # Both sides are summed per key and date in the same statement, with a sign column to tell them apart
+        selects = []
+        for sign, prefix in [(-1, 'old_'), (1, 'new_')]:
+            keys = [changed.c[prefix + x] for x in fields[:-1]]
+            grouped = (
+                select(literal(sign).label('sign'), *[x.label(x.name[len(prefix):]) for x in keys],
+                       func.sum(changed.c[prefix + 'amount']).label('amount'), func.count().label('count'))
+                .group_by(*keys)
+                .subquery(f'{prefix}grouped')
+            )
+            selects.append(_select_decoded_sums(grouped, grouped.c.sign))
+        result = await self._session.execute(union_all(*selects))
+        df = pd.DataFrame(result.all(), columns=['sign', *_WIRE_KEYS, 'amount', 'count'])
+        old = domain.WireBatch.from_frame(df.loc[df['sign'] < 0].drop(columns='sign'))
+        new = domain.WireBatch.from_frame(df.loc[df['sign'] > 0].drop(columns='sign'))
+        return old, new
+
+    async def get_wire_page(self, filter_by: dict, after: domain.WireCursor | None, limit: int,
+                            asc: bool) -> list[domain.Wire]:
+        return await self._wire_repo.get_page(filter_by, after, limit, asc)
+
+    async def increment_wire_aggregates(self, wires: domain.WireBatch, sign: int = 1):
+        if len(wires) == 0:
+            return
+        df = wires.to_frame().copy()
+        df['day'] = df['date'].dt.ceil('D')
+        df['amount'] = df['amount'] * sign
+        df['count'] = df['count'] * sign
+        await self._increment_sums(WireAggregateModel, ['source_id', 'day', 'sender', 'receiver', 'sub1', 'sub2'],
+                                   df, sign)
+        await self._increment_sums(SourcePlanItemModel, ['source_id', 'sender', 'receiver', 'sub1', 'sub2'], df, sign)
+        await self._increment_source_stats(df, sign)
+
+    async def _increment_sums(self, model: Type[Base], keys: list[str], df: pd.DataFrame, sign: int):
+        df = df.groupby(keys, as_index=False)[['amount', 'count']].sum()
+        rows = [
+            dict(zip(keys, [v.to_pydatetime() if isinstance(v, pd.Timestamp) else v for v in x[:-2]]),
+                 amount=float(x[-2]), count=int(x[-1]), id=uuid4())
+            for x in df[[*keys, 'amount', 'count']].itertuples(index=False, name=None)
+        ]
+
+        table = model.__table__
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={
+                'amount': table.c.amount + stmt.excluded.amount,
+                'count': table.c.count + stmt.excluded.count,
+                'updated_at': func.now(),
+            },
+        )
+        await self._session.execute(stmt, rows)
+        if sign < 0:
+            source_ids = list(df['source_id'].unique())
+            await self._session.execute(
+                delete(table).where(table.c.source_id.in_(source_ids), table.c.count <= 0)
+            )
+
+    async def _increment_source_stats(self, df: pd.DataFrame, sign: int):
+        table = SourceInfoModel.__table__
+        wire = WireModel.__table__
+        stats = df.groupby('source_id').agg(count=('count', 'sum'), amount=('amount', 'sum'),
+                                            start=('date', 'min'), end=('date', 'max'))
+        for source_id, x in stats.iterrows():
+            values = {
+                'wire_count': table.c.wire_count + int(x['count']),
+                'total_amount': table.c.total_amount + float(x['amount']),
+            }
+            if sign > 0:
+                values['total_start_date'] = func.least(table.c.total_start_date, x['start'].to_pydatetime())
+                values['total_end_date'] = func.greatest(table.c.total_end_date, x['end'].to_pydatetime())
+            else:
+                # Bounds cannot be decremented; wires are already gone, so read the new ones from the date index
+                values['total_start_date'] = (
+                    select(func.min(wire.c.date)).where(wire.c.source_id == source_id).scalar_subquery()
+                )
+                values['total_end_date'] = (
+                    select(func.max(wire.c.date)).where(wire.c.source_id == source_id).scalar_subquery()
+                )
+            await self._session.execute(update(table).where(table.c.id == source_id).values(**values))
+
+    async def remove_wire_aggregates(self, source_id: UUID):
+        for model in [WireAggregateModel, SourcePlanItemModel]:
+            table = model.__table__
+            await self._session.execute(delete(table).where(table.c.source_id == source_id))
+
+    async def get_plan_items(self, source_id: UUID, search: str = None,
+                             limit: int = None, offset: int = None) -> list[domain.SourcePlanItem]:
+        stmt = select(SourcePlanItemModel).where(SourcePlanItemModel.source_id == source_id)
+        if search:
+            stmt = stmt.where(or_(
+                cast(SourcePlanItemModel.sender, String).startswith(search, autoescape=True),
+                cast(SourcePlanItemModel.receiver, String).startswith(search, autoescape=True),
+                SourcePlanItemModel.sub1.startswith(search, autoescape=True),
+                SourcePlanItemModel.sub2.startswith(search, autoescape=True),
+            ))
+        stmt = (
+            stmt.order_by(SourcePlanItemModel.sender, SourcePlanItemModel.receiver,
+                          SourcePlanItemModel.sub1, SourcePlanItemModel.sub2)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self._session.scalars(stmt)
+        return [x.to_entity() for x in result]
+
+
+_WIRE_KEYS = ['source_id', 'date', 'sender', 'receiver', 'sub1', 'sub2']
+_WIRE_VALUES = ['id', 'date', 'amount', 'source_id']
+_WIRE_CODES = [f'{x}_code' for x in _WIRE_DICTIONARIES]
+
+
+def _join_dictionaries(source, cols: list[str]) -> tuple:
+    """Joins source, which has source_id and <col>_code columns, to the dictionaries that decode cols"""
+    joined, decoded = source, {}
+    for col in cols:
+        dictionary = _WIRE_DICTIONARIES[col].__table__.alias(f'{col}_dictionary')
+        joined = joined.join(dictionary, and_(dictionary.c.source_id == source.c.source_id,
+                                              dictionary.c.code == source.c[f'{col}_code']))
+        decoded[col] = dictionary.c.value.label(col)
+    return joined, decoded
+
+
+def _select_wires(*clauses):
+    table = WireModel.__table__
+    joined, decoded = _join_dictionaries(table, list(_WIRE_DICTIONARIES))
+    columns = [decoded[x] if x in decoded else table.c[x] for x in domain.WireBatch.columns]
+    return select(*columns).select_from(joined).where(*clauses)
+
+
+def _select_decoded_sums(grouped, *columns):
+    # Sums are grouped on codes, so only their distinct keys are decoded
+    joined, decoded = _join_dictionaries(grouped, list(_WIRE_DICTIONARIES))
+    return (
+        select(*columns, grouped.c.source_id, grouped.c.date, *decoded.values(), grouped.c.amount, grouped.c.count)
+        .select_from(joined)
+    )
+
+
+def _parse_wire_filter_by(filter_by: dict) -> list:
+    # Accounts and subcontos are matched through their codes, so the codes index still applies
+    table = WireModel.__table__
+    coded = {k: v for k, v in filter_by.items() if k.split('.')[0] in _WIRE_DICTIONARIES}
+    clauses = helpers.postgres.parse_filter_by(WireModel, {k: v for k, v in filter_by.items() if k not in coded})
+    for key, value in coded.items():
+        col = key.split('.')[0]
+        model = _WIRE_DICTIONARIES[col]
+        codes = (
+            select(model.__table__.c.code)
+            .where(model.__table__.c.source_id == table.c.source_id,
+                   *helpers.postgres.parse_filter_by(model, {'value' + key[len(col):]: value}))
+        )
+        clauses.append(table.c[f'{col}_code'].in_(codes))
+    return clauses
+
+
+def _parse_wire_order_by(stmt, order_by: OrderBy) -> list:
+    fields = [order_by.fields] if isinstance(order_by.fields, str) else order_by.fields
+    return [stmt.selected_columns[x].asc() if order_by.asc else stmt.selected_columns[x].desc() for x in fields]
+
+
+def _parse_wire_filter(wire_filter: domain.WireFilter) -> list:
+    filter_by = {
+        'source_id': wire_filter.source_id,
+        'date.__gte': wire_filter.date_from,
+        'date.__lte': wire_filter.date_to,
+        **{x: getattr(wire_filter, x) for x in _WIRE_DICTIONARIES},
+    }
+    return _parse_wire_filter_by({k: v for k, v in filter_by.items() if v is not None})
+
+
+def _aggregate_frame(rows, ccols: list[domain.Ccol]) -> pd.DataFrame:
+    # Typed even when empty, so Finrep can compare the dates with its period edges
+    frame = pd.DataFrame(rows, columns=[*ccols, 'date', 'amount', 'count'])
+    return frame.astype({'date': 'datetime64[ns, UTC]', 'amount': 'float64', 'count': 'int64'})
+
+
+def _is_utc_midnight(date) -> bool:
+    if date.tzinfo is None:
+        return False
+    date = pd.Timestamp(date).tz_convert('UTC')
+    return date == date.normalize()
 
 
-class ReportRepo(PostgresRepo):
+class ReportRepo(PostgresRepo, services.ReportRepo):
     def __init__(self, session: AsyncSession, model: Type[Base] = ReportModel):
         super().__init__(session, model)
 
+    async def add_many(self, data: list[domain.Report]):
+        await super().add_many(data)
+        rows = [dict(id=uuid4(), report_id=x.id, key=key, count=count)
+                for x in data for key, count in x.plan_items.uniques.items()]
+        if rows:
+            await self._session.flush()
+            await self._session.execute(insert(ReportPlanItemModel.__table__), rows)
+
     async def get_one_by_id(self, uuid: UUID) -> domain.Report:
         stmt = (
             select(ReportModel, SourceInfoModel)
@@ -209,7 +620,8 @@ class ReportRepo(PostgresRepo):
         )
         data = await self._session.execute(stmt)
         data = data.__next__()
-        report = ReportModel.to_entity_from_tuple(data)
+        uniques = await self._get_plan_items([uuid])
+        report = ReportModel.to_entity_from_tuple(data, uniques.get(uuid))
         return report
 
     async def get_many_by_id(self, ids: list[UUID], order_by: OrderBy = None) -> list[domain.Report]:
@@ -222,6 +634,40 @@ class ReportRepo(PostgresRepo):
             .join(SourceInfoModel, SourceInfoModel.id == ReportModel.source_id)
         )
         stmt = self._expand_statement(stmt, filter_by, order_by, slice_from, slice_to)
-        data = await self._session.execute(stmt)
-        reports = [ReportModel.to_entity_from_tuple(x) for x in data]
+        data = (await self._session.execute(stmt)).all()
+        uniques = await self._get_plan_items([x[0].id for x in data])
+        reports = [ReportModel.to_entity_from_tuple(x, uniques.get(x[0].id)) for x in data]
         return reports
+
+    async def get_summaries(self, filter_by: dict = None, order_by: OrderBy = None) -> list[domain.ReportSummary]:
+        # Plan items and the sheet index are neither selected nor joined
+        stmt = (
+            select(ReportModel, SourceInfoModel)
+            .join(SourceInfoModel, SourceInfoModel.id == ReportModel.source_id)
+            .options(defer(ReportModel.plan_items), defer(ReportModel.sheet_index))
+        )
+        stmt = self._expand_statement(stmt, filter_by, order_by)
+        data = await self._session.execute(stmt)
+        return [x[0].to_summary(x[1]) for x in data]
+
+    async def increment_plan_items(self, report_id: UUID, counts: dict[str, int]):
+        table = ReportPlanItemModel.__table__
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['report_id', 'key'],
+            set_={'count': table.c.count + stmt.excluded.count, 'updated_at': func.now()},
+        )
+        rows = [dict(id=uuid4(), report_id=report_id, key=key, count=count) for key, count in counts.items()]
+        await self._session.execute(stmt, rows)
+        if any(x < 0 for x in counts.values()):
+            await self._session.execute(delete(table).where(table.c.report_id == report_id, table.c.count <= 0))
+
+    async def _get_plan_items(self, report_ids: list[UUID]) -> dict[UUID, dict[str, int]]:
+        if not report_ids:
+            return {}
+        table = ReportPlanItemModel.__table__
+        stmt = select(table.c.report_id, table.c.key, table.c.count).where(table.c.report_id.in_(report_ids))
+        result: dict[UUID, dict[str, int]] = {}
+        for report_id, key, count in await self._session.execute(stmt):
+            result.setdefault(report_id, {})[key] = count
+        return result
@@ -1,13 +1,17 @@
+import asyncio
+import json
 from datetime import datetime
+from typing import Iterator, BinaryIO, AsyncIterator
 from uuid import UUID
 
 import pandas as pd
-from fastapi import APIRouter, Depends, UploadFile
+from fastapi import APIRouter, Depends, UploadFile, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
 
 from src import helpers
-from src.core import OrderBy
+from src.sheet.infrastructure import hub
 import db
-from . import schema
+from . import schema, arrow
 from .. import bootstrap, commands, domain
 
 router_source = APIRouter(
@@ -43,6 +47,7 @@ async def delete_source(source_id: UUID, get_asession=Depends(db.get_async_sessi
         await cmd.execute()
         await boot.get_event_bus().run()
         await session.commit()
+        await hub.get_sheet_hub().publish(boot.get_cascade())
         return 1
 
 
@@ -56,11 +61,15 @@ async def get_source(source_id: UUID, get_asession=Depends(db.get_async_session)
 
 
 @router_source.get("/{source_id}/plan-items")
-async def get_plan_items(source_id: UUID, get_asession=Depends(db.get_async_session)) -> list[domain.Wire]:
+async def get_plan_items(source_id: UUID,
+                         search: str = None,
+                         limit: int = Query(100, gt=0, le=10_000),
+                         offset: int = Query(0, ge=0),
+                         get_asession=Depends(db.get_async_session)) -> list[domain.SourcePlanItem]:
     async with get_asession as session:
         boot = bootstrap.Bootstrap(session)
-        cmd = commands.GetUniqueWires(fields=["sender", "receiver", "sub1", "sub2"],
-                                      source_id=source_id, receiver=boot.get_source_service())
+        cmd = commands.GetPlanItems(source_id=source_id, search=search, limit=limit, offset=offset,
+                                    receiver=boot.get_source_service())
         result = await cmd.execute()
         return result
 
@@ -71,33 +80,98 @@ router_wire = APIRouter(
 )
 
 
+CSV_CHUNK_SIZE = 100_000
+
+
+def read_csv_wires(file: BinaryIO, source_id: UUID) -> Iterator[domain.WireBatch]:
+    for df in pd.read_csv(file, parse_dates=['date'], chunksize=CSV_CHUNK_SIZE):
+        df['amount'] = df['debit'] - df['credit']
+        yield domain.WireBatch.from_frame(df[['sender', 'receiver', 'sub1', 'sub2', 'date', 'amount']],
+                                          source_id=source_id)
+
+
+async def apply_wire_chunks(boot: bootstrap.Bootstrap, cmd: commands.AppendWireChunks) -> AsyncIterator[int]:
+    # Reports take each flushed batch before the next chunk is read, so queued wires stay bounded by the upload
+    bus = boot.get_event_bus()
+    async for imported in cmd.execute():
+        await bus.run()
+        yield imported
+    await bus.run()
+
+
 @router_wire.post("/{source_id}/csv")
 async def create_wires_from_csv(source_id: UUID, file: UploadFile, get_asession=Depends(db.get_async_session)) -> int:
     async with get_asession as session:
         boot = bootstrap.Bootstrap(session)
         source_info = await commands.GetSourceInfoById(id=source_id, receiver=boot.get_source_service()).execute()
+        cmd = commands.AppendWireChunks(chunks=read_csv_wires(file.file, source_info.id), source_info=source_info,
+                                        receiver=boot.get_source_service())
+        async for _ in apply_wire_chunks(boot, cmd):
+            pass
+        await session.commit()
+        await hub.get_sheet_hub().publish(boot.get_cascade())
+        return 1
 
-        df = pd.read_csv(file.file, parse_dates=['date'])
-        df['date'] = pd.to_datetime(df['date'], utc=True)
-        df['amount'] = df['debit'] - df['credit']
-        df = df[['sender', 'receiver', 'sub1', 'sub2', 'date', 'amount']]
-        wires = [domain.Wire(**x, source_id=source_info.id) for x in df.to_dict(orient='records')]
-        cmd = commands.AppendWires(wires=wires, source_info=source_info, receiver=boot.get_source_service())
-        await cmd.execute()
-        await boot.get_event_bus().run()
+
+@router_wire.post("/{source_id}/csv/stream")
+async def stream_wires_from_csv(source_id: UUID, file: UploadFile,
+                                get_asession=Depends(db.get_async_session)) -> StreamingResponse:
+    async def progress():
+        async with get_asession as session:
+            boot = bootstrap.Bootstrap(session)
+            source_info = await commands.GetSourceInfoById(id=source_id,
+                                                           receiver=boot.get_source_service()).execute()
+            cmd = commands.AppendWireChunks(chunks=read_csv_wires(file.file, source_info.id),
+                                            source_info=source_info, receiver=boot.get_source_service())
+            imported = 0
+            async for imported in apply_wire_chunks(boot, cmd):
+                yield json.dumps({"imported": imported, "done": False}) + "\n"
+            await session.commit()
+            await hub.get_sheet_hub().publish(boot.get_cascade())
+            yield json.dumps({"imported": imported, "done": True}) + "\n"
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+@router_wire.post("/{source_id}/import")
+async def import_wires(source_id: UUID, file: UploadFile, fmt: arrow.WireFormat = Query("parquet", alias="format"),
+                       get_asession=Depends(db.get_async_session)) -> int:
+    async with get_asession as session:
+        boot = bootstrap.Bootstrap(session)
+        source_info = await commands.GetSourceInfoById(id=source_id, receiver=boot.get_source_service()).execute()
+        cmd = commands.AppendWireChunks(chunks=arrow.read_wire_batches(file.file, fmt, source_info.id),
+                                        source_info=source_info, receiver=boot.get_source_service())
+        async for _ in apply_wire_chunks(boot, cmd):
+            pass
         await session.commit()
+        await hub.get_sheet_hub().publish(boot.get_cascade())
         return 1
 
 
+@router_wire.get("/{source_id}/export")
+async def export_wires(source_id: UUID, fmt: arrow.WireFormat = Query("parquet", alias="format"),
+                       get_asession=Depends(db.get_async_session)) -> StreamingResponse:
+    async def content():
+        async with get_asession as session:
+            boot = bootstrap.Bootstrap(session)
+            batches = commands.StreamWires(source_id=source_id, receiver=boot.get_source_service()).execute()
+            async for chunk in arrow.write_wire_batches(batches, fmt):
+                yield chunk
+
+    return StreamingResponse(content(), media_type=arrow.MEDIA_TYPES[fmt])
+
+
 @router_wire.post("/{source_id}")
 async def create_wires(source_id: UUID, wires: list[domain.Wire], get_asession=Depends(db.get_async_session)) -> int:
     async with get_asession as session:
         boot = bootstrap.Bootstrap(session)
         source_info = await commands.GetSourceInfoById(id=source_id, receiver=boot.get_source_service()).execute()
-        cmd = commands.AppendWires(wires=wires, source_info=source_info, receiver=boot.get_source_service())
+        cmd = commands.AppendWires(wires=domain.WireBatch.from_wires(wires), source_info=source_info,
+                                   receiver=boot.get_source_service())
         await cmd.execute()
         await boot.get_event_bus().run()
         await session.commit()
+        await hub.get_sheet_hub().publish(boot.get_cascade())
         return 1
 
 
@@ -106,11 +180,12 @@ async def update_wire(wire_id: UUID, data: domain.Wire, get_asession=Depends(db.
     async with get_asession as session:
         boot = bootstrap.Bootstrap(session)
         sf = await commands.GetSourceInfoById(id=data.source_id, receiver=boot.get_source_service()).execute()
-        old_data = await commands.GetWires(filter_by={"id": wire_id}, receiver=boot.get_source_service()).execute()
-        await commands.DeleteWires(wires=old_data, source_info=sf, receiver=boot.get_source_service()).execute()
-        await commands.AppendWires(source_info=sf, wires=[data], receiver=boot.get_source_service()).execute()
+        data = data.model_copy(update={"id": wire_id})
+        await commands.UpdateWires(wires=domain.WireBatch.from_wires([data]), source_info=sf,
+                                   receiver=boot.get_source_service()).execute()
         await boot.get_event_bus().run()
         await session.commit()
+        await hub.get_sheet_hub().publish(boot.get_cascade())
         return data
 
 
@@ -120,27 +195,52 @@ async def delete_wire(wire_id: UUID, get_asession=Depends(db.get_async_session))
         boot = bootstrap.Bootstrap(session)
         wires = await commands.GetWires(filter_by={"id": wire_id}, receiver=boot.get_source_service()).execute()
         sf = await commands.GetSourceInfoById(id=wires[0].source_id, receiver=boot.get_source_service()).execute()
-        await commands.DeleteWires(wires=wires, source_info=sf, receiver=boot.get_source_service()).execute()
+        await commands.DeleteWires(wires=domain.WireBatch.from_wires(wires), source_info=sf,
+                                   receiver=boot.get_source_service()).execute()
         await boot.get_event_bus().run()
         await session.commit()
+        await hub.get_sheet_hub().publish(boot.get_cascade())
         return 1
 
 
+@router_wire.delete("/")
+async def delete_wires_by(wire_filter: domain.WireFilter = Depends(),
+                          get_asession=Depends(db.get_async_session)) -> int:
+    async with get_asession as session:
+        boot = bootstrap.Bootstrap(session)
+        sf = await commands.GetSourceInfoById(id=wire_filter.source_id, receiver=boot.get_source_service()).execute()
+        count = await commands.DeleteWiresBy(wire_filter=wire_filter, source_info=sf,
+                                             receiver=boot.get_source_service()).execute()
+        await boot.get_event_bus().run()
+        await session.commit()
+        await hub.get_sheet_hub().publish(boot.get_cascade())
+        return count
+
+
+@router_wire.patch("/")
+async def update_wires_by(data: schema.WireBulkUpdateSchema, get_asession=Depends(db.get_async_session)) -> int:
+    async with get_asession as session:
+        boot = bootstrap.Bootstrap(session)
+        sf = await commands.GetSourceInfoById(id=data.filter.source_id, receiver=boot.get_source_service()).execute()
+        count = await commands.UpdateWiresBy(wire_filter=data.filter, values=data.values, source_info=sf,
+                                             receiver=boot.get_source_service()).execute()
+        await boot.get_event_bus().run()
+        await session.commit()
+        await hub.get_sheet_hub().publish(boot.get_cascade())
+        return count
+
+
 @router_wire.get("/")
 async def get_many(source_id: UUID,
                    date: datetime = None,
                    sender: float = None,
                    receiver: float = None,
-                   debit: float = None,
-                   credit: float = None,
                    subconto_first: str = None,
                    subconto_second: str = None,
-                   comment: str = None,
-                   paginate_from: int = None,
-                   paginate_to: int = None,
-                   order_by: str = 'date',
+                   cursor: str = None,
+                   limit: int = Query(1000, gt=0, le=10_000),
                    asc: bool = False,
-                   get_asession=Depends(db.get_async_session)) -> list[domain.Wire]:
+                   get_asession=Depends(db.get_async_session)) -> schema.WirePageSchema:
     filter_by = {
         "source_id": source_id,
         "date": date,
@@ -150,13 +250,16 @@ async def get_many(source_id: UUID,
         "sub2": subconto_second,
     }
     filter_by = {key: value for key, value in filter_by.items() if value is not None}
-    order_by = OrderBy(order_by, asc)
+    try:
+        after = domain.WireCursor.decode(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
     async with get_asession as session:
         boot = bootstrap.Bootstrap(session)
-        cmd = commands.GetWires(filter_by=filter_by, order_by=order_by, slice_from=paginate_from, slice_to=paginate_to,
-                                receiver=boot.get_source_service())
-        wires = await cmd.execute()
-        return wires
+        cmd = commands.GetWirePage(filter_by=filter_by, after=after, limit=limit, asc=asc,
+                                   receiver=boot.get_source_service())
+        wires, next_cursor = await cmd.execute()
+        return schema.WirePageSchema(wires=wires, next_cursor=next_cursor.encode() if next_cursor else None)
 
 
 router_report = APIRouter(
@@ -171,12 +274,62 @@ async def create_report(data: schema.ReportCreateSchema,
                         get_asession=Depends(db.get_async_session)) -> domain.Report:
     async with get_asession as session:
         boot = bootstrap.Bootstrap(session)
-        source = await commands.GetSourceById(id=data.source_id, receiver=boot.get_source_service()).execute()
-        cmd = commands.CreateReport(
+        interval = data.interval.to_interval()
+        if data.pushdown:
+            source_info = await commands.GetSourceInfoById(id=data.source_id,
+                                                           receiver=boot.get_source_service()).execute()
+            aggregates = await commands.GetWireAggregates(source_id=data.source_id, ccols=data.ccols,
+                                                          interval=interval,
+                                                          receiver=boot.get_source_service()).execute()
+            cmd = commands.CreateReportFromAggregates(
+                title=data.title,
+                interval=interval,
+                plan_items=domain.PlanItems(ccols=data.ccols),
+                category=data.category,
+                source_info=source_info,
+                aggregates=aggregates,
+                receiver=boot.get_report_service(),
+            )
+        else:
+            source = await commands.GetSourceById(id=data.source_id, receiver=boot.get_source_service()).execute()
+            cmd = commands.CreateReport(
+                title=data.title,
+                interval=interval,
+                plan_items=domain.PlanItems(ccols=data.ccols),
+                category=data.category,
+                source=source,
+                receiver=boot.get_report_service(),
+            )
+        report = await cmd.execute()
+        await session.commit()
+        return report
+
+
+async def load_aggregates(source_id: UUID, ccols: list[domain.Ccol],
+                          interval: domain.Interval) -> tuple[domain.SourceInfo, pd.DataFrame]:
+    # Every source gets its own session, so the aggregate queries of several sources run concurrently
+    async with db.get_async_session() as session:
+        service = bootstrap.Bootstrap(session).get_source_service()
+        source_info = await commands.GetSourceInfoById(id=source_id, receiver=service).execute()
+        aggregates = await commands.GetWireAggregates(source_id=source_id, ccols=ccols, interval=interval,
+                                                      receiver=service).execute()
+        return source_info, aggregates
+
+
+@router_report.post("/consolidated")
+@helpers.decorators.async_timeit
+async def create_consolidated_report(data: schema.ConsolidatedReportCreateSchema,
+                                     get_asession=Depends(db.get_async_session)) -> domain.Report:
+    interval = data.interval.to_interval()
+    source_ids = list(dict.fromkeys(data.source_ids))
+    aggregates = await asyncio.gather(*[load_aggregates(x, data.ccols, interval) for x in source_ids])
+    async with get_asession as session:
+        boot = bootstrap.Bootstrap(session)
+        cmd = commands.CreateConsolidatedReport(
             title=data.title,
-            interval=data.interval.to_interval(),
+            interval=interval,
             plan_items=domain.PlanItems(ccols=data.ccols),
-            source=source,
+            aggregates=list(aggregates),
             receiver=boot.get_report_service(),
         )
         report = await cmd.execute()
@@ -212,6 +365,28 @@ async def get_report(report_id: UUID, get_asession=Depends(db.get_async_session)
         return schema.ReportRetrieveSchema.from_entity(report)
 
 
+@router_report.get("/{report_id}/cells/{cell_id}/wires")
+async def get_cell_wires(report_id: UUID, cell_id: UUID,
+                         cursor: str = None,
+                         limit: int = Query(1000, gt=0, le=10_000),
+                         get_asession=Depends(db.get_async_session)) -> schema.WirePageSchema:
+    try:
+        after = domain.WireCursor.decode(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    async with get_asession as session:
+        boot = bootstrap.Bootstrap(session)
+        try:
+            filter_by = await commands.GetCellWireFilter(report_id=report_id, cell_id=cell_id,
+                                                         receiver=boot.get_report_service()).execute()
+        except LookupError as err:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(err))
+        cmd = commands.GetWirePage(filter_by=filter_by, after=after, limit=limit, asc=True,
+                                   receiver=boot.get_source_service())
+        wires, next_cursor = await cmd.execute()
+        return schema.WirePageSchema(wires=wires, next_cursor=next_cursor.encode() if next_cursor else None)
+
+
 @router_report.delete("/{report_id}")
 async def delete_report(report_id: UUID, get_asession=Depends(db.get_async_session)) -> int:
     async with get_asession as session:
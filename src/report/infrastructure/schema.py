@@ -3,7 +3,7 @@ from datetime import datetime
 from uuid import UUID
 
 import pandas as pd
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from .. import domain
 
@@ -57,6 +57,15 @@ class ReportCreateSchema(BaseModel):
     ccols: list[domain.Ccol]
     source_id: UUID
     interval: IntervalSchema
+    category: typing.Literal["PROFIT", "BALANCE"] = "PROFIT"
+    pushdown: bool = True
+
+
+class ConsolidatedReportCreateSchema(BaseModel):
+    title: str
+    ccols: list[domain.Ccol]
+    source_ids: list[UUID] = Field(min_length=1)
+    interval: IntervalSchema
 
 
 class SheetSchema(BaseModel):
@@ -71,11 +80,12 @@ class ReportRetrieveSchema(BaseModel):
     updated_at: datetime
     category: str
     source_info: domain.SourceInfo
+    source_ids: list[UUID] = []
     sheet_info: domain.SheetInfo
     linked_sheets: list[domain.SheetInfo]
 
     @classmethod
-    def from_entity(cls, entity: domain.Report):
+    def from_entity(cls, entity: domain.Report | domain.ReportSummary):
         return cls(
             id=entity.id,
             category=entity.category,
@@ -83,6 +93,17 @@ class ReportRetrieveSchema(BaseModel):
             interval=IntervalSchema.from_interval(entity.interval),
             updated_at=entity.updated_at,
             source_info=entity.source_info,
+            source_ids=entity.source_ids,
             sheet_info=entity.sheet_info,
             linked_sheets=entity.linked_sheets,
         )
+
+
+class WireBulkUpdateSchema(BaseModel):
+    filter: domain.WireFilter
+    values: domain.WireAssignment
+
+
+class WirePageSchema(BaseModel):
+    wires: list[domain.Wire]
+    next_cursor: typing.Optional[str] = None
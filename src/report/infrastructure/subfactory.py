@@ -4,18 +4,19 @@ from ..subscriber import SubscriberFactory, SourceSubscriber
 from .. import domain, services
 from ...base import eventbus
 from ...base.broker import Broker
-from ...base.repo.repository import Repository
+from ...base.executor import Executor
 
 
 class ReportSubfac(SubscriberFactory):
-    def __init__(self, broker: Broker, repo: Repository[domain.Report],
-                 sheet_gateway: services.SheetGateway, queue: eventbus.Queue):
+    def __init__(self, broker: Broker, repo: services.ReportRepo,
+                 sheet_gateway: services.SheetGateway, queue: eventbus.Queue, executor: Executor = None):
         self._broker = broker
+        self._executor = executor
         self._queue = queue
         self._sheet_gw = sheet_gateway
         self._repo = repo
 
     def create_source_subscriber(self, entity: BaseModel) -> SourceSubscriber:
         if isinstance(entity, domain.Report):
-            return services.ReportPublisher(entity, self._repo, self._sheet_gw, self._broker)
+            return services.ReportPublisher(entity, self._repo, self._sheet_gw, self._broker, self._executor)
         raise TypeError
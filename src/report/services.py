@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Self
+from typing import Self, Iterable, AsyncIterator
 from uuid import UUID
 
 import numpy as np
@@ -8,6 +8,7 @@ from sortedcontainers import SortedList
 
 from src.base import eventbus
 from src.base.broker import Broker
+from src.base.executor import Executor, InlineExecutor
 from src.base.repo.repository import Repository
 from src.core import OrderBy, Table
 
@@ -32,6 +33,46 @@ class SourceRepo(ABC):
     async def get_source_by_id(self, uuid: UUID) -> domain.Source:
         raise NotImplemented
 
+    @abstractmethod
+    async def get_wire_aggregates(self, source_id: UUID, ccols: list[domain.Ccol],
+                                  interval: domain.Interval) -> pd.DataFrame:
+        raise NotImplemented
+
+    @abstractmethod
+    async def add_wires(self, wires: domain.WireBatch):
+        raise NotImplemented
+
+    @abstractmethod
+    def stream_wires(self, source_id: UUID, chunk_size: int) -> AsyncIterator[domain.WireBatch]:
+        raise NotImplemented
+
+    @abstractmethod
+    async def get_wire_page(self, filter_by: dict, after: domain.WireCursor | None, limit: int,
+                            asc: bool) -> list[domain.Wire]:
+        raise NotImplemented
+
+    @abstractmethod
+    async def increment_wire_aggregates(self, wires: domain.WireBatch, sign: int = 1):
+        raise NotImplemented
+
+    @abstractmethod
+    async def remove_wire_aggregates(self, source_id: UUID):
+        raise NotImplemented
+
+    @abstractmethod
+    async def get_plan_items(self, source_id: UUID, search: str = None,
+                             limit: int = None, offset: int = None) -> list[domain.SourcePlanItem]:
+        raise NotImplemented
+
+    @abstractmethod
+    async def delete_wires_by(self, wire_filter: domain.WireFilter) -> domain.WireBatch:
+        raise NotImplemented
+
+    @abstractmethod
+    async def update_wires_by(self, wire_filter: domain.WireFilter,
+                              values: domain.WireAssignment) -> tuple[domain.WireBatch, domain.WireBatch]:
+        raise NotImplemented
+
 
 class SourceService:
     def __init__(self, repo: SourceRepo, queue: eventbus.Queue):
@@ -40,14 +81,24 @@ class SourceService:
 
     async def create_source(self, source: domain.Source):
         await self._repo.add_source(source)
+        await self._repo.increment_wire_aggregates(domain.WireBatch.from_wires(source.wires))
 
     async def delete_source_by_id(self, uuid: UUID):
         await self._repo.wire_repo.remove_many(filter_by={"source_id": uuid})
+        await self._repo.remove_wire_aggregates(uuid)
         await self._repo.source_info_repo.remove_many(filter_by={"id": uuid})
 
     async def get_source_by_id(self, uuid: UUID) -> domain.Source:
         return await self._repo.get_source_by_id(uuid)
 
+    async def get_wire_aggregates(self, source_id: UUID, ccols: list[domain.Ccol],
+                                  interval: domain.Interval) -> pd.DataFrame:
+        return await self._repo.get_wire_aggregates(source_id, ccols, interval)
+
+    async def get_plan_items(self, source_id: UUID, search: str = None,
+                             limit: int = None, offset: int = None) -> list[domain.SourcePlanItem]:
+        return await self._repo.get_plan_items(source_id, search, limit, offset)
+
     async def get_source_info_by_id(self, uuid: UUID) -> domain.SourceInfo:
         return await self._repo.source_info_repo.get_one_by_id(uuid)
 
@@ -58,37 +109,145 @@ class SourceService:
                         slice_from: int = None, slice_to: int = None) -> list[domain.Wire]:
         return await self._repo.wire_repo.get_many(filter_by, order_by, slice_from, slice_to)
 
+    def stream_wires(self, source_id: UUID, chunk_size: int = 100_000) -> AsyncIterator[domain.WireBatch]:
+        return self._repo.stream_wires(source_id, chunk_size)
+
+    async def get_wire_page(self, filter_by: dict, after: domain.WireCursor = None, limit: int = 1000,
+                            asc: bool = True) -> tuple[list[domain.Wire], domain.WireCursor | None]:
+        # One extra row tells whether another page exists without a COUNT
+        wires = await self._repo.get_wire_page(filter_by, after, limit + 1, asc)
+        if len(wires) <= limit:
+            return wires, None
+        wires = wires[:limit]
+        return wires, domain.WireCursor.from_wire(wires[-1])
+
     async def get_uniques(self, by_fields: list[str], filter_by: dict, order_by: OrderBy = None) -> list[domain.Wire]:
         return await self._repo.wire_repo.get_uniques(by_fields, filter_by, order_by)
 
-    async def update_wires(self, source_info: domain.SourceInfo, wires: list[domain.Wire]):
-        old_wires = await self._repo.wire_repo.get_many_by_id([x.id for x in wires])
-        await self.delete_wires(source_info, old_wires)
-        await self.append_wires(source_info, wires)
-
-    async def append_wires(self, source_info: domain.SourceInfo, wires: list[domain.Wire]):
-        await self._repo.wire_repo.add_many(wires)
+    async def update_wires(self, source_info: domain.SourceInfo, wires: domain.WireBatch):
+        old_wires = domain.WireBatch.from_wires(await self._repo.wire_repo.get_many_by_id(wires.ids))
+        await self._repo.wire_repo.remove_many(filter_by={"id.__in": old_wires.ids})
+        await self._repo.add_wires(wires)
+        await self._repo.increment_wire_aggregates(old_wires, sign=-1)
+        await self._repo.increment_wire_aggregates(wires)
+        self._queue.append(events.WiresUpdated(key="WiresUpdated", old_values=old_wires, new_values=wires,
+                                               source_info=source_info))
+
+    async def append_wires(self, source_info: domain.SourceInfo, wires: domain.WireBatch):
+        await self._repo.add_wires(wires)
+        await self._repo.increment_wire_aggregates(wires)
         self._queue.append(events.WiresAppended(key='WiresAppended', wires=wires, source_info=source_info))
 
-    async def delete_wires(self, source_info: domain.SourceInfo, wires: list[domain.Wire]):
-        await self._repo.wire_repo.remove_many(filter_by={"id.__in": [x.id for x in wires]})
+    async def append_wire_chunks(self, source_info: domain.SourceInfo,
+                                 chunks: Iterable[domain.WireBatch]) -> AsyncIterator[int]:
+        """Inserts chunk by chunk, yields the wire count so far and publishes the summed wires
+        whenever the accumulator reaches its row budget and once more at the end.
+        Callers run the event bus after every yield, so at most one published batch is held at a time"""
+        total = WireAccumulator()
+        for wires in chunks:
+            await self._repo.add_wires(wires)
+            await self._repo.increment_wire_aggregates(wires)
+            total.add(wires)
+            if total.is_full:
+                self._queue.append(events.WiresAppended(key='WiresAppended', wires=total.pop_batch(),
+                                                        source_info=source_info))
+            yield total.count
+        if total.rows > 0:
+            self._queue.append(events.WiresAppended(key='WiresAppended', wires=total.pop_batch(),
+                                                    source_info=source_info))
+
+    async def delete_wires(self, source_info: domain.SourceInfo, wires: domain.WireBatch):
+        await self._repo.wire_repo.remove_many(filter_by={"id.__in": wires.ids})
+        await self._repo.increment_wire_aggregates(wires, sign=-1)
+        self._queue.append(events.WiresDeleted(key="WiresDeleted", wires=wires, source_info=source_info))
+
+    async def delete_wires_by(self, source_info: domain.SourceInfo, wire_filter: domain.WireFilter) -> int:
+        """Deletes matching wires in one statement; the event carries sums per key and date, not every wire"""
+        wires = await self._repo.delete_wires_by(wire_filter)
+        if wires.count == 0:
+            return 0
+        await self._repo.increment_wire_aggregates(wires, sign=-1)
         self._queue.append(events.WiresDeleted(key="WiresDeleted", wires=wires, source_info=source_info))
+        return wires.count
+
+    async def update_wires_by(self, source_info: domain.SourceInfo, wire_filter: domain.WireFilter,
+                              values: domain.WireAssignment) -> int:
+        if not values.to_values():
+            return 0
+        old_wires, new_wires = await self._repo.update_wires_by(wire_filter, values)
+        if old_wires.count == 0:
+            return 0
+        await self._repo.increment_wire_aggregates(old_wires, sign=-1)
+        await self._repo.increment_wire_aggregates(new_wires)
+        self._queue.append(events.WiresUpdated(key="WiresUpdated", old_values=old_wires, new_values=new_wires,
+                                               source_info=source_info))
+        return old_wires.count
+
+
+class WireAccumulator:
+    """Buffers wires of many batches, summing rows of the same timestamp, accounts and subcontos.
+    Real uploads rarely repeat a timestamp, so memory is bounded by max_rows rather than by the sums"""
+    keys = ['source_id', 'date', 'sender', 'receiver', 'sub1', 'sub2']
+    max_rows = 100_000
+
+    def __init__(self):
+        self._frame: pd.DataFrame | None = None
+        self.count = 0
+
+    @property
+    def rows(self) -> int:
+        return 0 if self._frame is None else len(self._frame)
+
+    @property
+    def is_full(self) -> bool:
+        return self.rows >= self.max_rows
+
+    def add(self, wires: domain.WireBatch):
+        frame = wires.to_frame()[[*self.keys, 'amount', 'count']]
+        if self._frame is not None:
+            frame = pd.concat([self._frame, frame])
+        self._frame = frame.groupby(self.keys, as_index=False, sort=False)[['amount', 'count']].sum()
+        self.count += wires.count
+
+    def pop_batch(self) -> domain.WireBatch:
+        batch = domain.WireBatch.from_frame(self._frame)
+        self._frame = None
+        return batch
 
 
 class SourceHandler:
-    def __init__(self, subfac: subscriber.SubscriberFactory, broker: Broker):
+    def __init__(self, subfac: subscriber.SubscriberFactory, broker: Broker, executor: Executor = None):
         self._subfac = subfac
         self._broker = broker
+        self._executor = InlineExecutor() if executor is None else executor
 
     async def handle_wires_appended(self, event: events.WiresAppended):
         subs = await self._broker.get_subs(event.source_info)
+        cache = WireDeltaCache.from_batch(event.wires, executor=self._executor)
         for sub in subs:
-            await self._subfac.create_source_subscriber(sub).on_wires_appended(event.wires)
+            await self._subfac.create_source_subscriber(sub).on_wires_appended(cache)
 
     async def handle_wires_deleted(self, event: events.WiresDeleted):
         subs = await self._broker.get_subs(event.source_info)
+        cache = WireDeltaCache.from_batch(event.wires, sign=-1, executor=self._executor)
         for sub in subs:
-            await self._subfac.create_source_subscriber(sub).on_wires_deleted(event.wires)
+            await self._subfac.create_source_subscriber(sub).on_wires_deleted(cache)
+
+    async def handle_wires_updated(self, event: events.WiresUpdated):
+        subs = await self._broker.get_subs(event.source_info)
+        cache = WireDeltaCache.from_update(event.old_values, event.new_values, executor=self._executor)
+        for sub in subs:
+            await self._subfac.create_source_subscriber(sub).on_wires_updated(cache)
+
+
+class ReportRepo(Repository[domain.Report], ABC):
+    @abstractmethod
+    async def get_summaries(self, filter_by: dict = None, order_by: OrderBy = None) -> list[domain.ReportSummary]:
+        raise NotImplemented
+
+    @abstractmethod
+    async def increment_plan_items(self, report_id: UUID, counts: dict[str, int]):
+        raise NotImplemented
 
 
 class SheetGateway(ABC):
@@ -96,6 +255,10 @@ class SheetGateway(ABC):
     async def get_sheet_by_id(self, sheet_id: UUID) -> sheet_domain.Sheet:
         raise NotImplemented
 
+    @abstractmethod
+    async def get_row_of_cell(self, sheet_id: UUID, cell_id: UUID) -> list[sheet_domain.Cell]:
+        raise NotImplemented
+
     @abstractmethod
     async def create_sheet(self, sheet: sheet_domain.Sheet = None) -> UUID:
         raise NotImplemented
@@ -109,7 +272,12 @@ class SheetGateway(ABC):
         raise NotImplemented
 
     @abstractmethod
-    async def merge_sheets(self, target_sheet_id: UUID, data: sheet_domain.Sheet, merge_on: list[int]):
+    async def merge_sheets(self, target_sheet_id: UUID, data: sheet_domain.Sheet,
+                           merge_on: list[int]) -> sheet_domain.Sheet:
+        raise NotImplemented
+
+    @abstractmethod
+    async def increment_cells(self, sheet_id: UUID, deltas: list[tuple[UUID, UUID, float]]):
         raise NotImplemented
 
 
@@ -127,31 +295,40 @@ class Finrep:
         return self
 
     def create_report_df(self) -> Self:
-        wires: pd.DataFrame = self._wire_df.copy()
-        wires['interval'] = pd.cut(wires['date'], self._interval.to_date_range(), right=True)
-
-        needed_cols = ['interval'] + self._ccols + ['amount']
-        wires = (
-            wires[needed_cols]
-            .groupby(needed_cols[:-1], observed=False)
-            .sum()
-            .reset_index()
-            .set_index(self._ccols)
+        bins = pd.DatetimeIndex(self._interval.to_date_range())
+        if bins.tz is None:
+            # An interval without edges gives a naive index, which can't be compared with wire dates
+            bins = bins.tz_localize('UTC')
+        # An empty frame has an object date column, so dates are coerced to UTC before the search
+        dates = pd.DatetimeIndex(pd.to_datetime(self._wire_df['date'], utc=True))
+
+        # Period k covers (bins[k], bins[k + 1]], dates outside the interval are skipped
+        periods = bins.searchsorted(dates, side='left') - 1
+        mask = (periods >= 0) & (periods < len(bins) - 1)
+        periods = periods[mask]
+        amounts = self._wire_df.loc[mask, 'amount'].to_numpy(dtype=np.float64)
+        key_codes, index = domain.encode_keys(self._wire_df.loc[mask, self._ccols], self._ccols)
+
+        size = (len(index), max(len(bins) - 1, 0))
+        matrix = np.bincount(key_codes * size[1] + periods, weights=amounts, minlength=size[0] * size[1])
+        self._report_df = pd.DataFrame(
+            matrix.reshape(size),
+            index=index,
+            columns=pd.DatetimeIndex(bins[1:], freq=None),
         )
+        return self
 
-        self._report_df = self._split_df_by_intervals(wires)
+    def cumulate(self) -> Self:
+        # Every period holds the running total, so a flow is added to its own and all later periods
+        self._report_df = self._report_df.cumsum(axis=1)
         return self
 
     def drop_zero_rows(self) -> Self:
-        self._report_df = self._report_df.replace(0, np.nan)
-        self._report_df = self._report_df.dropna(axis=0, how='all')
-        self._report_df = self._report_df.replace(np.nan, 0)
+        self._report_df = self._report_df.loc[(self._report_df.to_numpy() != 0).any(axis=1)]
         return self
 
     def drop_zero_cols(self) -> Self:
-        self._report_df = self._report_df.replace(0, np.nan)
-        self._report_df = self._report_df.dropna(axis=1, how='all')
-        self._report_df = self._report_df.replace(np.nan, 0)
+        self._report_df = self._report_df.loc[:, (self._report_df.to_numpy() != 0).any(axis=0)]
         return self
 
     def reset_indexes(self) -> Self:
@@ -177,120 +354,197 @@ class Finrep:
         if sf is None:
             sf = sheet_domain.SheetInfo(title="Report")
 
+        # Values come from our own frame, so the sheet is built with model_construct() and skips validation
+        values = self._report_df.to_numpy(dtype=object).tolist()
         size = (len(self._report_df.index), len(self._report_df.columns))
+        index_size = len(self._ccols)
 
-        rows = [sheet_domain.RowSindex(sheet_id=sf.id, position=i) for i in range(0, size[0])]
-        rows[0].is_freeze = True
-
-        cols = [sheet_domain.ColSindex(sheet_id=sf.id, position=j) for j in range(0, size[1])]
-        for j in range(0, len(self._ccols)):
-            cols[j].is_freeze = True
+        rows = [sheet_domain.RowSindex.model_construct(sheet_id=sf.id, position=i, is_freeze=i == 0)
+                for i in range(0, size[0])]
+        cols = [sheet_domain.ColSindex.model_construct(sheet_id=sf.id, position=j, is_freeze=j < index_size)
+                for j in range(0, size[1])]
 
         table = []
-        for i in range(0, size[0]):
+        for i, row in enumerate(rows):
             cells = []
-            for j in range(0, size[1]):
-                cells.append(sheet_domain.Cell(
-                    row=rows[i],
-                    col=cols[j],
+            for j, col in enumerate(cols):
+                cell = sheet_domain.Cell.model_construct(
+                    row=row,
+                    col=col,
                     sheet_id=sf.id,
-                    value=self._report_df.iloc[i, j],
-                    background="#F8FAFDFF" if i == 0 or j < len(self._ccols) else "white",
+                    background="#F8FAFDFF" if i == 0 or j < index_size else "white",
                     is_readonly=True,
-                ))
+                )
+                cell._value = values[i][j]
+                cells.append(cell)
             table.append(cells)
-        return sheet_domain.Sheet(rows=rows, cols=cols, table=table, sf=sf)
-
-    @staticmethod
-    def _split_df_by_intervals(df: pd.DataFrame) -> pd.DataFrame:
-        if 'interval' not in df.columns:
-            raise ValueError('"interval" not in df.columns')
-        if len(df.columns) > 2:
-            raise ValueError(f'function expected df with to columns only (and the first column must be "interval")'
-                             f'real columns are: {df.columns}')
-
-        splited = []
-        columns = []
-
-        for interval in df['interval'].unique():
-            series = df.loc[df['interval'] == interval].drop('interval', axis=1)
-            splited.append(series)
-            columns.append(interval.right)
-        splited = pd.concat(splited, axis=1).fillna(0)
-        splited.columns = columns
-        return splited
+        return sheet_domain.Sheet.model_construct(rows=rows, cols=cols, table=table, sf=sf)
+
+    @classmethod
+    def from_report_df(cls, report_df: pd.DataFrame, ccols: list[domain.Ccol], interval: domain.Interval) -> Self:
+        finrep = cls(pd.DataFrame(), ccols, interval)
+        finrep._report_df = report_df
+        return finrep
+
+
+def select_interval_wires(wires: pd.DataFrame, interval: domain.Interval) -> pd.DataFrame:
+    # Same (first edge, last edge] window as Finrep and the wire aggregates; without two edges there are no periods
+    edges = pd.DatetimeIndex(interval.to_date_range())
+    if len(edges) < 2:
+        return wires.iloc[0:0]
+    return wires.loc[(wires['date'] > edges[0]) & (wires['date'] <= edges[-1])]
+
+
+def build_report_df(wires: pd.DataFrame, ccols: list[domain.Ccol], interval: domain.Interval,
+                    cumulative: bool = False) -> pd.DataFrame:
+    # Module level so that it can be sent to a process pool
+    finrep = Finrep(wires, ccols, interval).validate().create_report_df()
+    if cumulative:
+        finrep = finrep.cumulate()
+    return (
+        finrep
+        .drop_zero_rows()
+        .drop_zero_cols()
+        .round()
+        .get_report_df()
+    )
+
+
+class WireDeltaCache:
+    """Report frames of one wire batch, computed once per (ccols, interval) for all subscribed reports"""
+
+    def __init__(self, wires: pd.DataFrame, executor: Executor = None):
+        self._wires = wires
+        self._executor = InlineExecutor() if executor is None else executor
+        self._frames: dict[tuple, pd.DataFrame] = {}
+        self._counts: dict[tuple, dict[str, int]] = {}
+
+    @classmethod
+    def from_batch(cls, wires: domain.WireBatch, sign: int = 1, executor: Executor = None) -> Self:
+        df = wires.to_frame()
+        if sign < 0:
+            df = df.assign(amount=-df["amount"], count=-df["count"])
+        return cls(df, executor)
+
+    @classmethod
+    def from_update(cls, old: domain.WireBatch, new: domain.WireBatch, executor: Executor = None) -> Self:
+        # Old values cancel new ones wherever a report does not group by the edited fields
+        old = old.to_frame()
+        df = pd.concat([old.assign(amount=-old["amount"], count=-old["count"]), new.to_frame()], ignore_index=True)
+        return cls(df, executor)
+
+    async def get(self, ccols: list[domain.Ccol], interval: domain.Interval, cumulative: bool = False) -> pd.DataFrame:
+        key = (tuple(ccols), interval.start_date, interval.end_date, interval.freq, cumulative)
+        if key not in self._frames:
+            self._frames[key] = await self._executor.run(build_report_df, self._wires, ccols, interval, cumulative)
+        return self._frames[key]
+
+    def count_keys(self, ccols: list[domain.Ccol], interval: domain.Interval) -> dict[str, int]:
+        """Signed wire counts per plan item key; keys whose wires cancel out are left out"""
+        key = (tuple(ccols), interval.start_date, interval.end_date, interval.freq)
+        if key not in self._counts:
+            wires = select_interval_wires(self._wires, interval)
+            counts = domain.PlanItems(ccols=ccols).count_keys(wires)
+            self._counts[key] = {k: v for k, v in counts.items() if v != 0}
+        return self._counts[key]
 
 
 class ReportPublisher(subscriber.SourceSubscriber):
-    def __init__(self, entity: domain.Report, repo: Repository[domain.Report],
-                 sheet_gw: SheetGateway, broker: Broker):
+    def __init__(self, entity: domain.Report, repo: ReportRepo,
+                 sheet_gw: SheetGateway, broker: Broker, executor: Executor = None):
         self._entity = entity
+        self._executor = InlineExecutor() if executor is None else executor
         self._broker = broker
         self._sheet_gw = sheet_gw
         self._repo = repo
 
     async def follow_source(self, source: domain.Source):
+        wires = domain.WireBatch.from_wires(source.wires).to_frame()
+        wires = select_interval_wires(wires, self._entity.interval)
+        await self._follow([source.source_info], wires.assign(count=1))
+
+    async def follow_aggregates(self, source_info: domain.SourceInfo, aggregates: pd.DataFrame):
+        await self._follow([source_info], aggregates)
+
+    async def follow_consolidated(self, source_infos: list[domain.SourceInfo], aggregates: pd.DataFrame):
+        # Aggregates of all members are summed by one build; later events carry the delta of one member only
+        await self._follow(source_infos, aggregates)
+
+    async def _follow(self, source_infos: list[domain.SourceInfo], wires: pd.DataFrame):
+        # Every row of wires carries a 'count' of the raw wires it stands for
         self._entity.plan_items = domain.PlanItems(ccols=self._entity.plan_items.ccols)
-        wires = [x.model_dump(exclude={'source_info'}) for x in source.wires]
-        wires = pd.DataFrame.from_records(wires)
-        wires = wires.loc[
-            (wires['date'] >= self._entity.interval.start_date)
-            & (wires['date'] <= self._entity.interval.end_date)
-            ]
-        wires['key'] = ''
-        for ccol in self._entity.plan_items.ccols:
-            wires['key'] += wires[ccol].astype(str)
-        pl = wires.groupby('key')['id'].count().to_dict()
+        pl = self._entity.plan_items.count_keys(wires)
         self._entity.plan_items.uniques = pl
         self._entity.plan_items.order = SortedList(pl.keys())
 
+        ccols, interval = self._entity.plan_items.ccols, self._entity.interval
+        report_df = await self._executor.run(build_report_df, wires, ccols, interval, self._entity.cumulative)
         sheet = (
-            Finrep(wires, self._entity.plan_items.ccols, self._entity.interval)
-            .validate()
-            .create_report_df()
-            .drop_zero_rows()
-            .drop_zero_cols()
-            .round()
+            Finrep.from_report_df(report_df, ccols, interval)
             .reset_indexes()
             .to_sheet(sf=sheet_domain.SheetInfo(id=self._entity.sheet_info.id, title="Report"))
         )
         await self._sheet_gw.update_sheet(data=sheet)
-        await self._broker.subscribe([source.source_info], self._entity)
-
-    async def on_wires_appended(self, wires: list[domain.Wire]):
-        wires = pd.DataFrame([x.model_dump(exclude={'source_info'}) for x in wires])
-        sheet = (
-            Finrep(wires, self._entity.plan_items.ccols, self._entity.interval)
-            .validate()
-            .create_report_df()
-            .drop_zero_rows()
-            .drop_zero_cols()
-            .round()
-            .reset_indexes()
-            .to_sheet()
-        )
-        merge_on = list(range(0, len(self._entity.plan_items.ccols)))
-        await self._sheet_gw.merge_sheets(self._entity.sheet_info.id, sheet, merge_on)
-
-    async def on_wires_deleted(self, wires: list[domain.Wire]):
-        wires = pd.DataFrame([x.model_dump(exclude={'source_info'}) for x in wires])
-        wires["amount"] = -wires["amount"]
-        sheet = (
-            Finrep(wires, self._entity.plan_items.ccols, self._entity.interval)
-            .validate()
-            .create_report_df()
-            .drop_zero_cols()
-            .drop_zero_rows()
-            .round()
-            .reset_indexes()
-            .to_sheet()
-        )
-        merge_on = list(range(0, len(self._entity.plan_items.ccols)))
-        await self._sheet_gw.merge_sheets(self._entity.sheet_info.id, sheet, merge_on)
+        self._entity.sheet_index = self._make_sheet_index(sheet)
+        await self._broker.subscribe(source_infos, self._entity)
+
+    async def on_wires_appended(self, cache: WireDeltaCache):
+        await self._apply(cache)
+
+    async def on_wires_deleted(self, cache: WireDeltaCache):
+        await self._apply(cache)
+
+    async def on_wires_updated(self, cache: WireDeltaCache):
+        await self._apply(cache)
+
+    async def _apply(self, cache: WireDeltaCache):
+        ccols, interval = self._entity.plan_items.ccols, self._entity.interval
+        counts = cache.count_keys(ccols, interval)
+        if counts:
+            self._entity.plan_items.add_counts(counts)
+            await self._repo.increment_plan_items(self._entity.id, counts)
+        report_df = await cache.get(ccols, interval, self._entity.cumulative)
+        if report_df.empty:
+            return
+        deltas = self._find_cell_deltas(report_df)
+        if deltas is not None:
+            await self._sheet_gw.increment_cells(self._entity.sheet_info.id, deltas)
+            return
+
+        # New plan items or periods change the sheet shape, so the whole report is merged
+        data = Finrep.from_report_df(report_df, ccols, interval).reset_indexes().to_sheet()
+        merge_on = list(range(0, len(ccols)))
+        merged = await self._sheet_gw.merge_sheets(self._entity.sheet_info.id, data, merge_on)
+        self._entity.sheet_index = self._make_sheet_index(merged)
+        await self._repo.update_one(self._entity)
+
+    def _find_cell_deltas(self, report_df: pd.DataFrame) -> list[tuple[UUID, UUID, float]] | None:
+        index = self._entity.sheet_index
+        if index is None:
+            return None
+        try:
+            row_ids = [index.rows[self._entity.plan_items.make_key(x if isinstance(x, tuple) else (x,))]
+                       for x in report_df.index]
+            col_ids = [index.cols[index.make_period_key(x)] for x in report_df.columns]
+        except KeyError:
+            return None
+        values = report_df.to_numpy()
+        rows, cols = np.nonzero(values)
+        return [(row_ids[i], col_ids[j], float(values[i, j])) for i, j in zip(rows, cols)]
+
+    def _make_sheet_index(self, sheet: sheet_domain.Sheet) -> domain.SheetIndex:
+        index_size = len(self._entity.plan_items.ccols)
+        index = domain.SheetIndex()
+        for j in range(index_size, len(sheet.cols)):
+            index.cols[index.make_period_key(sheet.table[0][j].value)] = sheet.cols[j].id
+        for i in range(1, len(sheet.rows)):
+            key = self._entity.plan_items.make_key(x.value for x in sheet.table[i][:index_size])
+            index.rows[key] = sheet.rows[i].id
+        return index
 
 
 class ReportService:
-    def __init__(self, repo: Repository[domain.Report], sheet_gateway: SheetGateway,
+    def __init__(self, repo: ReportRepo, sheet_gateway: SheetGateway,
                  subfac: subscriber.SubscriberFactory):
         self._subfac = subfac
         self._gateway = sheet_gateway
@@ -300,7 +554,8 @@ class ReportService:
                      title: str,
                      source: domain.Source,
                      plan_items: domain.PlanItems,
-                     interval: domain.Interval) -> domain.Report:
+                     interval: domain.Interval,
+                     category: str = "PROFIT") -> domain.Report:
         sheet_id = await self._gateway.create_sheet()
         report = domain.Report(
             title=title,
@@ -308,12 +563,55 @@ class ReportService:
             sheet_info=domain.SheetInfo(id=sheet_id),
             interval=interval,
             plan_items=plan_items,
-            category="PROFIT",
+            category=category,
         )
         await self._subfac.create_source_subscriber(report).follow_source(source)
         await self._repo.add_many([report])
         return report
 
+    async def create_from_aggregates(self,
+                                     title: str,
+                                     source_info: domain.SourceInfo,
+                                     aggregates: pd.DataFrame,
+                                     plan_items: domain.PlanItems,
+                                     interval: domain.Interval,
+                                     category: str = "PROFIT") -> domain.Report:
+        sheet_id = await self._gateway.create_sheet()
+        report = domain.Report(
+            title=title,
+            source_info=source_info,
+            sheet_info=domain.SheetInfo(id=sheet_id),
+            interval=interval,
+            plan_items=plan_items,
+            category=category,
+        )
+        await self._subfac.create_source_subscriber(report).follow_aggregates(source_info, aggregates)
+        await self._repo.add_many([report])
+        return report
+
+    async def create_consolidated(self,
+                                  title: str,
+                                  aggregates: list[tuple[domain.SourceInfo, pd.DataFrame]],
+                                  plan_items: domain.PlanItems,
+                                  interval: domain.Interval) -> domain.Report:
+        if not aggregates:
+            raise ValueError("consolidated report needs at least one source")
+        source_infos = [x[0] for x in aggregates]
+        sheet_id = await self._gateway.create_sheet()
+        report = domain.Report(
+            title=title,
+            source_info=source_infos[0],
+            source_ids=[x.id for x in source_infos],
+            sheet_info=domain.SheetInfo(id=sheet_id),
+            interval=interval,
+            plan_items=plan_items,
+            category="CONSOLIDATED",
+        )
+        frame = pd.concat([x[1] for x in aggregates], ignore_index=True)
+        await self._subfac.create_source_subscriber(report).follow_consolidated(source_infos, frame)
+        await self._repo.add_many([report])
+        return report
+
     async def append_checker_sheet(self, report: domain.Report) -> domain.Report:
         report = report.model_copy(deep=True)
         checker_sheet_id = await self._gateway.create_checker_sheet(report.sheet_info.id)
@@ -327,5 +625,37 @@ class ReportService:
     async def get_many(self, filter_by: dict = None, order_by: OrderBy = None) -> list[domain.Report]:
         return await self._repo.get_many(filter_by, order_by)
 
+    async def get_summaries(self, filter_by: dict = None, order_by: OrderBy = None) -> list[domain.ReportSummary]:
+        return await self._repo.get_summaries(filter_by, order_by)
+
+    async def get_cell_wire_filter(self, report_id: UUID, cell_id: UUID) -> dict:
+        """Wire filter of the plan item and period a report cell sums; index cells cover the whole interval"""
+        report = await self._repo.get_one_by_id(report_id)
+        row = await self._gateway.get_row_of_cell(report.sheet_info.id, cell_id)
+        ccols = report.plan_items.ccols
+        if not row or row[0].row.position == 0:
+            raise LookupError(f"cell {cell_id} is not in a plan item row")
+
+        source_ids = report.source_ids or [report.source_info.id]
+        filter_by = {"source_id.__in": source_ids}
+        for ccol, cell in zip(ccols, row):
+            filter_by[ccol] = cell.value
+
+        # Period k of the sheet covers (bins[k], bins[k + 1]], its header is bins[k + 1];
+        # a balance period holds the running total, so its wires start at bins[0]
+        bins = pd.DatetimeIndex(report.interval.to_date_range())
+        start, end = bins[0], bins[-1]
+        col = next(x.col for x in row if x.id == cell_id)
+        if col.position >= len(ccols):
+            keys = {} if report.sheet_index is None else {v: k for k, v in report.sheet_index.cols.items()}
+            if col.id not in keys:
+                raise LookupError(f"column of cell {cell_id} is not a report period")
+            end = pd.Timestamp(keys[col.id])
+            if not report.cumulative:
+                start = bins[bins.get_loc(end) - 1]
+        filter_by["date.__gt"] = start.to_pydatetime()
+        filter_by["date.__lte"] = end.to_pydatetime()
+        return filter_by
+
     async def delete_many(self, filter_by: dict) -> None:
         await self._repo.remove_many(filter_by)
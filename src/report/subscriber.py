@@ -1,10 +1,15 @@
 from abc import abstractmethod, ABC
+from typing import TYPE_CHECKING
 
+import pandas as pd
 from pydantic import BaseModel
 
 from src.base.subscriber import Subscriber
 from . import domain
 
+if TYPE_CHECKING:
+    from .services import WireDeltaCache
+
 
 class SourceSubscriber(Subscriber):
     @abstractmethod
@@ -12,11 +17,23 @@ class SourceSubscriber(Subscriber):
         raise NotImplemented
 
     @abstractmethod
-    async def on_wires_appended(self, wires: list[domain.Wire]):
+    async def follow_aggregates(self, source_info: domain.SourceInfo, aggregates: pd.DataFrame):
+        raise NotImplemented
+
+    @abstractmethod
+    async def follow_consolidated(self, source_infos: list[domain.SourceInfo], aggregates: pd.DataFrame):
+        raise NotImplemented
+
+    @abstractmethod
+    async def on_wires_appended(self, cache: 'WireDeltaCache'):
+        raise NotImplemented
+
+    @abstractmethod
+    async def on_wires_deleted(self, cache: 'WireDeltaCache'):
         raise NotImplemented
 
     @abstractmethod
-    async def on_wires_deleted(self, wires: list[domain.Wire]):
+    async def on_wires_updated(self, cache: 'WireDeltaCache'):
         raise NotImplemented
 
 
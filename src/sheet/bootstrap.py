@@ -1,6 +1,6 @@
 import src.sheet.handlers
 from src.base.broker import Broker, BrokerRepoPostgres
-from ..base import eventbus
+from ..base import eventbus, executor
 from . import services, domain, handlers
 from .infrastructure import postgres
 
@@ -8,24 +8,27 @@ from .infrastructure import postgres
 class Bootstrap:
     def __init__(self, session):
         self._queue = eventbus.Queue()
+        self._cascade = services.Cascade()
         self._broker = Broker(BrokerRepoPostgres(session))
+        self._executor = executor.get_executor()
 
         self._sheet_repo: services.SheetRepository = postgres.SheetPostgresRepo(session)
         cell_service = services.CellService(self._sheet_repo, self._queue)
         formula_service = services.FormulaService(self._sheet_repo, self.get_broker())
-        self._sheet_service = services.SheetService(self._sheet_repo, cell_service, formula_service)
+        self._sheet_service = services.SheetService(self._sheet_repo, cell_service, formula_service, self._cascade,
+                                                     self._executor)
 
         self._report_sheet_service = services.ReportSheetService(repo=self._sheet_repo, broker=self._broker)
 
     def get_event_bus(self) -> eventbus.EventBus:
         bus = eventbus.EventBus(self._queue)
 
-        handler = src.sheet.handlers.CellHandler(self._queue, self._broker, self._sheet_repo)
-        bus.register("CellUpdated", handler.handle_cell_updated)
+        handler = src.sheet.handlers.CellHandler(self._queue, self._broker, self._sheet_repo, self._cascade)
+        bus.register_batch("CellUpdated", handler.handle_cells_updated)
         bus.register("CellDeleted", handler.handle_cell_deleted)
 
-        handler = handlers.FormulaHandler(self._queue, self._broker, self._sheet_repo)
-        bus.register("FormulaUpdated", handler.handle_formula_updated)
+        handler = handlers.FormulaHandler(self._queue, self._broker, self._sheet_repo, self._cascade)
+        bus.register_batch("FormulaUpdated", handler.handle_formulas_updated)
 
         handler = src.sheet.handlers.SindexHandler(self._queue, self._broker, self._sheet_repo)
         bus.register("SindexUpdated", handler.handle_sindex_updated)
@@ -33,6 +36,9 @@ class Bootstrap:
 
         return bus
 
+    def get_cascade(self) -> services.Cascade:
+        return self._cascade
+
     def get_sheet_service(self) -> services.SheetService:
         return self._sheet_service
 
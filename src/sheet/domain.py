@@ -341,15 +341,18 @@ def concat(lhs: Sheet, rhs: Sheet, axis=0, reindex=True) -> Sheet:
 
 
 def complex_merge(lhs: Sheet, rhs: Sheet, left_on: list[UUID], right_on: list[UUID], sort=False) -> Table[CellValue]:
+    return merge_frames(lhs.to_simple_frame(), rhs.to_simple_frame(), left_on, right_on, sort)
+
+
+def merge_frames(lhs: pd.DataFrame, rhs: pd.DataFrame, left_on: list[UUID], right_on: list[UUID],
+                 sort=False) -> Table[CellValue]:
     names = [f"lvl{x + 1}" for x in range(0, len(left_on))]
 
-    lhs = lhs.to_simple_frame()
     lhs = lhs.set_index(left_on)
     lhs.index = lhs.index.set_names(names)
     lhs.columns = lhs.iloc[0]
     lhs = lhs.iloc[1:]
 
-    rhs = rhs.to_simple_frame()
     rhs = rhs.set_index(right_on)
     rhs.index = rhs.index.set_names(names)
     rhs.columns = rhs.iloc[0]
@@ -428,3 +431,11 @@ class SheetDifference(BaseModel):
                 deleted.append(old_value)
 
         return created, updated, deleted
+
+
+def merge_sheets(target: Sheet, data: Sheet, target_on: list[int],
+                 data_on: list[int]) -> tuple[Sheet, SheetDifference]:
+    # Module level so that the merge, the resize and the diff can be sent to a process pool together
+    table = complex_merge(target, data, [target.cols[x].id for x in target_on], [data.cols[x].id for x in data_on])
+    merged = target.resize(len(table), len(table[0])).replace_cell_values(table, inplace=True)
+    return merged, SheetDifference.from_sheets(target, merged)
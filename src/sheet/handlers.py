@@ -4,26 +4,38 @@ from src.sheet import domain, services
 
 
 class Handler:
-    def __init__(self, queue: eventbus.Queue, broker: Broker, repo: services.SheetRepository):
+    def __init__(self, queue: eventbus.Queue, broker: Broker, repo: services.SheetRepository,
+                 cascade: services.Cascade = None):
         self._queue = queue
         self._broker = broker
         self._repo = repo
+        self._cascade = services.Cascade() if cascade is None else cascade
+
+    async def _propagate(self, events: list[eventbus.Updated]):
+        subs = await self._broker.get_subs_many([x.actual_entity for x in events])
+        touched = {}
+        for event in events:
+            for sub in subs.get(event.actual_entity.id, []):
+                await sub.on_cell_updated(old=event.old_entity, actual=event.actual_entity)
+                touched[sub.id] = sub
+        for sub in touched.values():
+            self._queue.extend(sub.events.parse_events())
 
 
 class FormulaHandler(Handler):
-    async def handle_formula_updated(self, event: eventbus.Updated[domain.Formula]):
-        await self._repo.formula_repo.update_one(event.actual_entity)
-        for sub in await self._broker.get_subs(event.actual_entity):
-            await sub.on_cell_updated(old=event.old_entity, actual=event.actual_entity)
-            self._queue.extend(sub.events.parse_events())
+    async def handle_formulas_updated(self, events: list[eventbus.Updated[domain.Formula]]):
+        events = eventbus.coalesce(events)
+        await self._repo.formula_repo.update_many([x.actual_entity for x in events])
+        self._cascade.add_formulas([x.actual_entity for x in events])
+        await self._propagate(events)
 
 
 class CellHandler(Handler):
-    async def handle_cell_updated(self, event: eventbus.Updated[domain.Cell]):
-        await self._repo.cell_repo.update_one(event.actual_entity)
-        for sub in await self._broker.get_subs(event.actual_entity):
-            await sub.on_cell_updated(old=event.old_entity, actual=event.actual_entity)
-            self._queue.extend(sub.events.parse_events())
+    async def handle_cells_updated(self, events: list[eventbus.Updated[domain.Cell]]):
+        events = eventbus.coalesce(events)
+        await self._repo.cell_repo.update_many([x.actual_entity for x in events])
+        self._cascade.add_cells([x.actual_entity for x in events])
+        await self._propagate(events)
 
     async def handle_cell_deleted(self, event: eventbus.Deleted[domain.Cell]):
         raise NotImplemented
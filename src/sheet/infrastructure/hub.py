@@ -0,0 +1,70 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Callable, Awaitable
+from uuid import UUID
+
+from fastapi import WebSocket
+from loguru import logger
+
+from src.helpers.decorators import singleton
+from .. import services
+from . import schema
+
+Receiver = Callable[[UUID, str], Awaitable[None]]
+
+
+class Transport(ABC):
+    @abstractmethod
+    def set_receiver(self, receiver: Receiver):
+        raise NotImplemented
+
+    @abstractmethod
+    async def publish(self, sheet_id: UUID, message: str):
+        raise NotImplemented
+
+
+class LocalTransport(Transport):
+    """Single node transport: messages go straight to the hub of this process"""
+
+    def __init__(self):
+        self._receiver: Receiver | None = None
+
+    def set_receiver(self, receiver: Receiver):
+        self._receiver = receiver
+
+    async def publish(self, sheet_id: UUID, message: str):
+        await self._receiver(sheet_id, message)
+
+
+class SheetHub:
+    def __init__(self, transport: Transport = None):
+        self._sockets: dict[UUID, set[WebSocket]] = {}
+        self._transport = LocalTransport() if transport is None else transport
+        self._transport.set_receiver(self._deliver)
+
+    async def connect(self, sheet_id: UUID, websocket: WebSocket):
+        await websocket.accept()
+        self._sockets.setdefault(sheet_id, set()).add(websocket)
+
+    def disconnect(self, sheet_id: UUID, websocket: WebSocket):
+        sockets = self._sockets.get(sheet_id, set())
+        sockets.discard(websocket)
+        if not sockets:
+            self._sockets.pop(sheet_id, None)
+
+    async def publish(self, cascade: services.Cascade):
+        for patch in schema.SheetPatchSchema.from_cascade(cascade):
+            await self._transport.publish(patch.sheet_id, patch.model_dump_json())
+
+    async def _deliver(self, sheet_id: UUID, message: str):
+        sockets = list(self._sockets.get(sheet_id, set()))
+        results = await asyncio.gather(*[x.send_text(message) for x in sockets], return_exceptions=True)
+        for websocket, result in zip(sockets, results):
+            if isinstance(result, Exception):
+                logger.warning(f"websocket of sheet {sheet_id} dropped: {result}")
+                self.disconnect(sheet_id, websocket)
+
+
+@singleton
+def get_sheet_hub() -> SheetHub:
+    return SheetHub()
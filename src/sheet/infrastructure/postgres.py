@@ -2,7 +2,8 @@ from datetime import datetime
 from typing import Type
 from uuid import UUID
 
-from sqlalchemy import select, Integer, ForeignKey, String, Boolean, JSON
+from sqlalchemy import select, Integer, ForeignKey, String, Boolean, JSON, Float, Uuid, update, values, column, cast, \
+    func, Numeric
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql.functions import count
@@ -204,6 +205,28 @@ class CellPostgresRepo(PostgresRepo, services.CellRepository):
     async def update_cell_by_position(self, sheet_id: UUID, row_pos: int, col_pos: int, data: dict):
         raise NotImplemented
 
+    async def increment_values(self, sheet_id: UUID, deltas: list[services.CellDelta]) -> list[domain.Cell]:
+        if len(deltas) == 0:
+            return []
+        delta = (
+            values(column("row_id", Uuid), column("col_id", Uuid), column("amount", Float), name="delta")
+            .data(deltas)
+        )
+        # Sums in numeric and rounds like the report does, so repeated increments don't drift from a rebuild
+        value = func.round(cast(CellModel.value, Numeric) + cast(delta.c.amount, Numeric), 2)
+        stmt = (
+            update(CellModel)
+            .where(CellModel.sheet_id == sheet_id,
+                   CellModel.row_sindex_id == delta.c.row_id,
+                   CellModel.col_sindex_id == delta.c.col_id)
+            .values(value=cast(cast(value, Float), String),
+                    dtype="float",
+                    updated_at=func.now())
+            .returning(CellModel.id)
+        )
+        ids = list(await self._session.scalars(stmt))
+        return await self.get_many_by_id(ids)
+
     async def get_many(self, filter_by: dict = None, order_by: OrderBy = None,
                        slice_from=None, slice_to=None) -> list[domain.Cell]:
         stmt = (
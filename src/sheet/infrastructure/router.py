@@ -1,12 +1,12 @@
 from uuid import UUID
-from fastapi import Depends, APIRouter
+from fastapi import Depends, APIRouter, WebSocket, WebSocketDisconnect, Request
 from starlette.responses import JSONResponse
 
 import db
 from src import helpers
 
 from .. import domain,  bootstrap, commands
-from . import schema
+from . import schema, hub
 
 router_sheet = APIRouter(
     prefix='/sheet',
@@ -16,14 +16,27 @@ router_sheet = APIRouter(
 
 @router_sheet.get("/{sheet_id}")
 @helpers.decorators.async_timeit
-async def get_sheet(sheet_id: UUID, get_asession=Depends(db.get_async_session)) -> schema.SheetSchema:
+async def get_sheet(sheet_id: UUID, request: Request, get_asession=Depends(db.get_async_session)) -> schema.SheetSchema:
     async with get_asession as session:
         boot = bootstrap.Bootstrap(session)
         cmd = commands.GetSheetById(id=sheet_id, receiver=boot.get_sheet_service())
         sheet = await cmd.execute()
+        if schema.COLUMNAR_MEDIA_TYPE in request.headers.get("accept", ""):
+            return JSONResponse(schema.ColumnarSheetSchema.from_sheet(sheet), media_type=schema.COLUMNAR_MEDIA_TYPE)
         return schema.SheetSchema.from_sheet(sheet)
 
 
+@router_sheet.websocket("/{sheet_id}/ws")
+async def listen_sheet(websocket: WebSocket, sheet_id: UUID):
+    sheet_hub = hub.get_sheet_hub()
+    await sheet_hub.connect(sheet_id, websocket)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        sheet_hub.disconnect(sheet_id, websocket)
+
+
 router_cell = APIRouter(
     prefix="/cell",
     tags=["Cell"],
@@ -32,16 +45,25 @@ router_cell = APIRouter(
 
 @router_cell.patch("/{cell_id}")
 @helpers.decorators.async_timeit
-async def update_cell(cell: domain.Cell, get_asession=Depends(db.get_async_session)) -> schema.CellSchema:
+async def update_cell(cell: domain.Cell, get_asession=Depends(db.get_async_session)) -> schema.CascadeSchema:
     async with get_asession as session:
         boot = bootstrap.Bootstrap(session)
         cmd = commands.UpdateCells(data=[cell], receiver=boot.get_sheet_service())
         await cmd.execute()
         await boot.get_event_bus().run()
         await session.commit()
-        return schema.CellSchema.from_cell(cell)
+        await hub.get_sheet_hub().publish(boot.get_cascade())
+        return schema.CascadeSchema.from_cascade(boot.get_cascade())
 
 
 @router_cell.patch("/")
-async def update_cells(data: list[domain.Cell], get_asession=Depends(db.get_async_session)) -> int:
-    raise NotImplemented
+@helpers.decorators.async_timeit
+async def update_cells(data: list[domain.Cell], get_asession=Depends(db.get_async_session)) -> schema.CascadeSchema:
+    async with get_asession as session:
+        boot = bootstrap.Bootstrap(session)
+        cmd = commands.UpdateCells(data=data, receiver=boot.get_sheet_service())
+        await cmd.execute()
+        await boot.get_event_bus().run()
+        await session.commit()
+        await hub.get_sheet_hub().publish(boot.get_cascade())
+        return schema.CascadeSchema.from_cascade(boot.get_cascade())
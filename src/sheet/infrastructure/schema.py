@@ -1,8 +1,9 @@
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel
 
-from .. import domain
+from .. import domain, services
 from . import helpers
 from ...core import Table
 
@@ -59,6 +60,61 @@ class CellSchema(BaseModel):
         )
 
 
+class CellPatchSchema(BaseModel):
+    value: str
+    dtype: domain.CellDtype
+
+    @classmethod
+    def from_cell(cls, cell: domain.Cell) -> 'CellPatchSchema':
+        return cls(value=str(cell.value), dtype=helpers.get_dtype(cell.value))
+
+
+class CascadeSchema(BaseModel):
+    cells: dict[UUID, CellPatchSchema]
+    formulas: dict[UUID, dict]
+
+    @classmethod
+    def from_cascade(cls, cascade: services.Cascade) -> 'CascadeSchema':
+        return cls(
+            cells={key: CellPatchSchema.from_cell(cell) for key, cell in cascade.cells.items()},
+            formulas={key: formula.to_json() for key, formula in cascade.formulas.items()},
+        )
+
+
+class SheetPatchSchema(BaseModel):
+    sheet_id: UUID
+    rows: list[SindexSchema]
+    cols: list[SindexSchema]
+    cells: list[CellSchema]
+    values: dict[UUID, CellPatchSchema]
+    rows_deleted: list[UUID]
+    cols_deleted: list[UUID]
+    cells_deleted: list[UUID]
+
+    @classmethod
+    def from_cascade(cls, cascade: services.Cascade) -> list['SheetPatchSchema']:
+        result = []
+        for sheet_id in cascade.sheet_ids:
+            diffs = cascade.differences.get(sheet_id, [])
+            rows = {x.id: x for diff in diffs for x in diff.rows_created + diff.rows_updated}
+            cols = {x.id: x for diff in diffs for x in diff.cols_created + diff.cols_updated}
+            cells = {x.id: x for diff in diffs for x in diff.cells_created}
+            values = {x.id: x for diff in diffs for x in diff.cells_updated}
+            values.update((key, x) for key, x in cascade.cells.items() if x.sheet_id == sheet_id)
+            cells.update((key, values[key]) for key in cells if key in values)
+            result.append(cls(
+                sheet_id=sheet_id,
+                rows=[SindexSchema.from_sindex(x) for x in rows.values()],
+                cols=[SindexSchema.from_sindex(x) for x in cols.values()],
+                cells=[CellSchema.from_cell(x) for x in cells.values()],
+                values={key: CellPatchSchema.from_cell(x) for key, x in values.items() if key not in cells},
+                rows_deleted=[x.id for diff in diffs for x in diff.rows_deleted],
+                cols_deleted=[x.id for diff in diffs for x in diff.cols_deleted],
+                cells_deleted=[x.id for diff in diffs for x in diff.cells_deleted],
+            ))
+        return result
+
+
 class SheetSchema(BaseModel):
     id: UUID
     rows: list[SindexSchema]
@@ -79,3 +135,47 @@ class SheetSchema(BaseModel):
             cols=[SindexSchema.from_sindex(x) for x in sheet.cols],
             table=table,
         )
+
+
+COLUMNAR_MEDIA_TYPE = "application/vnd.sheet.columnar+json"
+
+
+class ColumnarSheetSchema:
+    """Plain json builder: sindexes are sent once, cells as row-major parallel arrays with deduplicated styles"""
+
+    @staticmethod
+    def sindex_to_json(sindex: domain.Sindex) -> dict:
+        return {
+            "id": str(sindex.id),
+            "position": sindex.position,
+            "size": sindex.size,
+            "is_readonly": sindex.is_readonly,
+            "is_freeze": sindex.is_freeze,
+        }
+
+    @classmethod
+    def from_sheet(cls, sheet: domain.Sheet) -> dict:
+        ids = []
+        values = []
+        dtypes = []
+        style_ids = []
+        styles: dict[tuple[str, bool], int] = {}
+        for row in sheet.table:
+            for cell in row:
+                value = cell.value
+                ids.append(str(cell.id))
+                values.append(value.isoformat() if isinstance(value, datetime) else value)
+                dtypes.append(helpers.get_dtype(value))
+                style_ids.append(styles.setdefault((cell.background, cell.is_readonly), len(styles)))
+        return {
+            "id": str(sheet.sf.id),
+            "rows": [cls.sindex_to_json(x) for x in sheet.rows],
+            "cols": [cls.sindex_to_json(x) for x in sheet.cols],
+            "cells": {
+                "ids": ids,
+                "values": values,
+                "dtypes": dtypes,
+                "styles": style_ids,
+            },
+            "styles": [{"background": background, "is_readonly": is_readonly} for background, is_readonly in styles],
+        }
@@ -6,9 +6,11 @@ from src.base.repo.repository import Repository
 from . import domain
 from .. import helpers
 from ..base.broker import Broker
+from ..base.executor import Executor, InlineExecutor
 from ..base.eventbus import Queue, Updated
 
 Slice = tuple[int, int] | int
+CellDelta = tuple[UUID, UUID, float]  # (row_id, col_id, delta)
 
 
 class CellRepository(Repository, ABC):
@@ -21,6 +23,10 @@ class CellRepository(Repository, ABC):
     async def update_cell_by_position(self, sheet_id: UUID, row_pos: int, col_pos: int, data: dict):
         raise NotImplemented
 
+    @abstractmethod
+    async def increment_values(self, sheet_id: UUID, deltas: list[CellDelta]) -> list[domain.Cell]:
+        raise NotImplemented
+
 
 class SheetRepository(ABC):
     @property
@@ -56,6 +62,30 @@ class SheetRepository(ABC):
         raise NotImplemented
 
 
+class Cascade:
+    """Entities persisted while the event bus propagates a change"""
+
+    def __init__(self):
+        self.cells: dict[UUID, domain.Cell] = {}
+        self.formulas: dict[UUID, domain.Formula] = {}
+        self.differences: dict[UUID, list[domain.SheetDifference]] = {}
+
+    def add_cells(self, cells: Iterable[domain.Cell]):
+        for cell in cells:
+            self.cells[cell.id] = cell
+
+    def add_formulas(self, formulas: Iterable[domain.Formula]):
+        for formula in formulas:
+            self.formulas[formula.cell_id] = formula
+
+    def add_difference(self, sheet_id: UUID, diff: domain.SheetDifference):
+        self.differences.setdefault(sheet_id, []).append(diff)
+
+    @property
+    def sheet_ids(self) -> set[UUID]:
+        return set(x.sheet_id for x in self.cells.values()).union(self.differences.keys())
+
+
 class UpdateSheetFromDifference:
     def __init__(self, repo: SheetRepository):
         self._repo = repo
@@ -115,8 +145,11 @@ class FormulaService:
 
 
 class SheetService:
-    def __init__(self, repo: SheetRepository, cell_service: CellService, formula_service: FormulaService):
+    def __init__(self, repo: SheetRepository, cell_service: CellService, formula_service: FormulaService,
+                 cascade: Cascade = None, executor: Executor = None):
         self._repo = repo
+        self._cascade = Cascade() if cascade is None else cascade
+        self._executor = InlineExecutor() if executor is None else executor
         self.cell_service = cell_service
         self.formula_service = formula_service
 
@@ -129,22 +162,30 @@ class SheetService:
     async def get_sheet_by_id(self, sheet_id: UUID) -> domain.Sheet:
         return await self._repo.get_sheet_by_id(sheet_id)
 
+    async def get_row_of_cell(self, sheet_id: UUID, cell_id: UUID) -> list[domain.Cell]:
+        cell = await self.cell_service.get_by_id(cell_id)
+        if cell.sheet_id != sheet_id:
+            raise LookupError(f"cell {cell_id} is not in sheet {sheet_id}")
+        position = cell.row.position
+        return await self._repo.cell_repo.get_sliced_cells(sheet_id, slice_rows=(position, position + 1))
+
     async def update_sheet(self, sheet: domain.Sheet) -> None:
         old_sheet = await self._repo.get_sheet_by_id(sheet.sf.id)
         diff = domain.SheetDifference.from_sheets(old_sheet, sheet)
         await UpdateSheetFromDifference(repo=self._repo).update(diff)
+        self._cascade.add_difference(sheet.sf.id, diff)
+
+    async def increment_cells(self, sheet_id: UUID, deltas: list[CellDelta]) -> None:
+        cells = await self._repo.cell_repo.increment_values(sheet_id, deltas)
+        self._cascade.add_cells(cells)
 
-    async def complex_merge(self, target_id: UUID, data: domain.Sheet, target_on: list[int], data_on: list[int]):
+    async def complex_merge(self, target_id: UUID, data: domain.Sheet, target_on: list[int],
+                            data_on: list[int]) -> domain.Sheet:
         target = await self._repo.get_sheet_by_id(target_id)
-        table = domain.complex_merge(
-            lhs=target,
-            rhs=data,
-            left_on=[target.cols[x].id for x in target_on],
-            right_on=[data.cols[x].id for x in data_on],
-        )
-        merged = target.resize(len(table), len(table[0])).replace_cell_values(table, inplace=True)
-        diff = domain.SheetDifference.from_sheets(target, merged)
+        merged, diff = await self._executor.run(domain.merge_sheets, target, data, target_on, data_on)
         await UpdateSheetFromDifference(repo=self._repo).update(diff)
+        self._cascade.add_difference(target_id, diff)
+        return merged
 
 
 class CreateReportChecker:
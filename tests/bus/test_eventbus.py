@@ -0,0 +1,48 @@
+import pytest
+
+from src.base import eventbus
+from src.sheet import domain
+
+
+def test_coalesce_keeps_first_old_and_last_actual():
+    sheet = domain.Sheet.from_table([[1, 2]])
+    cell = sheet.cells[0]
+    cell.value = 10
+    cell.value = 20
+    other = sheet.cells[1]
+    other.value = 30
+    events = cell.events.parse_events() + other.events.parse_events()
+
+    actual = eventbus.coalesce(events)
+    assert len(actual) == 2
+    assert actual[0].old_entity.value == 1
+    assert actual[0].actual_entity.value == 20
+    assert actual[1].old_entity.value == 2
+    assert actual[1].actual_entity.value == 30
+
+
+@pytest.mark.asyncio
+async def test_batch_handler_receives_every_queued_event_of_its_key():
+    queue = eventbus.Queue()
+    bus = eventbus.EventBus(queue)
+    batches = []
+    singles = []
+
+    async def handle_batch(events):
+        batches.append(len(events))
+
+    async def handle_single(event):
+        singles.append(event)
+
+    bus.register_batch("CellUpdated", handle_batch)
+    bus.register("Other", handle_single)
+
+    sheet = domain.Sheet.from_table([[1, 2, 3]])
+    for cell in sheet.cells:
+        cell.value = 0
+        queue.extend(cell.events.parse_events())
+        queue.append(eventbus.Event(key="Other", id=cell.id))
+    await bus.run()
+
+    assert batches == [3]
+    assert len(singles) == 3
@@ -0,0 +1,19 @@
+import pandas as pd
+import pytest
+
+from src.base import executor
+from src.report import services
+from tests.report.test_finrep import create_wires, create_interval
+
+
+@pytest.mark.asyncio
+async def test_process_executor_builds_the_same_report_df():
+    wires = create_wires(1_000)
+    expected = await executor.InlineExecutor().run(services.build_report_df, wires, ["sender"], create_interval())
+
+    pool = executor.ProcessExecutor(max_workers=1)
+    try:
+        actual = await pool.run(services.build_report_df, wires, ["sender"], create_interval())
+    finally:
+        pool.shutdown()
+    pd.testing.assert_frame_equal(actual, expected)
@@ -0,0 +1,55 @@
+import io
+from uuid import uuid4
+
+import pandas as pd
+import pytest
+
+from src.report import domain
+from src.report.infrastructure import arrow
+from tests.report.test_finrep import create_wires
+
+
+async def collect(batches: list[domain.WireBatch], fmt: arrow.WireFormat) -> list[bytes]:
+    async def stream():
+        for batch in batches:
+            yield batch
+
+    return [x async for x in arrow.write_wire_batches(stream(), fmt)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+async def test_exported_wires_import_back(fmt):
+    source_id = uuid4()
+    batches = []
+    for seed in range(0, 3):
+        wires = create_wires(200, seed=seed)
+        wires["date"] = wires["date"].dt.floor("us")
+        batches.append(domain.WireBatch.from_frame(wires, source_id=source_id))
+
+    chunks = await collect(batches, fmt)
+    assert len(chunks) == len(batches) + 1
+
+    target_id = uuid4()
+    actual = pd.concat([x.to_frame() for x in arrow.read_wire_batches(io.BytesIO(b"".join(chunks)), fmt, target_id)])
+    expected = pd.concat([x.to_frame() for x in batches])
+    columns = ["date", "sender", "receiver", "amount", "sub1", "sub2"]
+    pd.testing.assert_frame_equal(actual[columns].reset_index(drop=True), expected[columns].reset_index(drop=True))
+    assert (actual["source_id"] == target_id).all()
+    assert set(actual["id"]).isdisjoint(expected["id"])
+
+
+def test_import_computes_amount_from_debit_and_credit():
+    frame = pd.DataFrame({
+        "date": pd.to_datetime(["2021-01-15"], utc=True),
+        "sender": [1.0],
+        "receiver": [2.0],
+        "debit": [10.0],
+        "credit": [4.0],
+    })
+    file = io.BytesIO()
+    frame.to_parquet(file)
+    file.seek(0)
+
+    actual = list(arrow.read_wire_batches(file, "parquet", uuid4()))
+    assert actual[0].to_frame()["amount"].tolist() == [6.0]
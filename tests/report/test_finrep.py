@@ -0,0 +1,147 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytz
+
+from src.report import domain, services
+
+
+def create_wires(size: int, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2020-12-01").value
+    end = pd.Timestamp("2021-07-01").value
+    return pd.DataFrame({
+        "date": pd.to_datetime(rng.integers(start, end, size), utc=True),
+        "sender": rng.integers(0, 20, size).astype(float),
+        "receiver": rng.integers(0, 20, size).astype(float),
+        "sub1": rng.choice(["first", "second", "third"], size),
+        "sub2": rng.choice(["no_info", "info"], size),
+        "amount": rng.normal(size=size).round(2),
+    })
+
+
+def create_interval() -> domain.Interval:
+    return domain.Interval(start_date=datetime(2020, 12, 31, tzinfo=pytz.UTC),
+                           end_date=datetime(2021, 5, 31, tzinfo=pytz.UTC),
+                           freq="1M")
+
+
+def test_create_report_df_equals_pivot():
+    wires = create_wires(5_000)
+    interval = create_interval()
+    ccols = ["sender", "sub1"]
+
+    actual = (
+        services.Finrep(wires, ccols, interval)
+        .create_report_df()
+        .drop_zero_rows()
+        .drop_zero_cols()
+        .get_report_df()
+    )
+
+    expected = wires.copy()
+    expected["period"] = pd.cut(expected["date"], interval.to_date_range(), right=True)
+    expected = expected.dropna(subset=["period"])
+    expected["period"] = expected["period"].map(lambda x: x.right).astype("datetime64[ns, UTC]")
+    expected = expected.pivot_table(index=ccols, columns="period", values="amount",
+                                    aggfunc="sum", fill_value=0)
+    assert list(actual.index) == list(expected.index)
+    assert list(actual.columns) == list(expected.columns)
+    assert np.allclose(actual.to_numpy(), expected.to_numpy())
+
+
+def test_create_report_df_skips_wires_outside_interval():
+    wires = pd.DataFrame({
+        "date": pd.to_datetime(["2020-12-31", "2021-01-31", "2021-02-01", "2021-06-01"], utc=True),
+        "sender": [1.0, 1.0, 2.0, 2.0],
+        "amount": [10.0, 20.0, 30.0, 40.0],
+    })
+    actual = services.Finrep(wires, ["sender"], create_interval()).create_report_df().get_report_df()
+    assert list(actual.index) == [1.0, 2.0]
+    assert actual.iloc[:, 0].tolist() == [20.0, 0.0]
+    assert actual.iloc[:, 1].tolist() == [0.0, 30.0]
+    assert actual.to_numpy().sum() == 50.0
+
+
+def test_drop_zero_rows_and_cols():
+    wires = pd.DataFrame({
+        "date": pd.to_datetime(["2021-01-15", "2021-01-16", "2021-03-15"], utc=True),
+        "sender": [1.0, 2.0, 2.0],
+        "amount": [10.0, 5.0, 0.0],
+    })
+    actual = (
+        services.Finrep(wires, ["sender"], create_interval())
+        .create_report_df()
+        .drop_zero_rows()
+        .drop_zero_cols()
+        .get_report_df()
+    )
+    assert actual.shape == (2, 1)
+
+
+def test_to_sheet_keeps_freeze_flags_and_header_backgrounds():
+    wires = create_wires(500)
+    finrep = (
+        services.Finrep(wires, ["sender", "sub1"], create_interval())
+        .create_report_df()
+        .drop_zero_rows()
+        .drop_zero_cols()
+        .round()
+        .reset_indexes()
+    )
+    report_df = finrep.get_report_df()
+    sheet = finrep.to_sheet()
+
+    assert sheet.size == report_df.shape
+    assert [x.is_freeze for x in sheet.rows] == [True] + [False] * (len(sheet.rows) - 1)
+    assert [x.is_freeze for x in sheet.cols] == [True, True] + [False] * (len(sheet.cols) - 2)
+    for i, row in enumerate(sheet.table):
+        for j, cell in enumerate(row):
+            assert cell.row is sheet.rows[i]
+            assert cell.col is sheet.cols[j]
+            assert cell.value == report_df.iloc[i, j]
+            assert cell.is_readonly
+            assert cell.background == ("#F8FAFDFF" if i == 0 or j < 2 else "white")
+
+
+def test_count_keys_equals_string_groupby():
+    wires = create_wires(5_000).assign(count=2)
+    plan_items = domain.PlanItems(ccols=["sender", "sub1", "sub2"])
+
+    keys = wires["sender"].astype(str) + domain.KEY_SEP + wires["sub1"] + domain.KEY_SEP + wires["sub2"]
+    expected = wires.groupby(keys)["count"].sum().to_dict()
+    assert plan_items.count_keys(wires) == expected
+    assert plan_items.make_key([1, "2", "3"]) != plan_items.make_key([12, "", "3"])
+    assert domain.PlanItems(ccols=["sub1"]).count_keys(wires.iloc[0:0]) == {}
+
+
+def test_count_keys_does_not_overflow_on_many_distinct_keys():
+    # 70_000 ** 4 distinct combinations exceed int64
+    size = 70_000
+    rng = np.random.default_rng(0)
+    wires = pd.DataFrame({
+        "sender": rng.permutation(size).astype(float),
+        "receiver": rng.permutation(size).astype(float),
+        "sub1": rng.permutation(size).astype(str),
+        "sub2": rng.permutation(size).astype(str),
+        "count": 1,
+    })
+    wires = pd.concat([wires, wires.iloc[:100]])
+    plan_items = domain.PlanItems(ccols=["sender", "receiver", "sub1", "sub2"])
+
+    keys = (wires["sender"].astype(str) + domain.KEY_SEP + wires["receiver"].astype(str)
+            + domain.KEY_SEP + wires["sub1"] + domain.KEY_SEP + wires["sub2"])
+    expected = wires.groupby(keys)["count"].sum().to_dict()
+    assert plan_items.count_keys(wires) == expected
+
+
+def test_cumulative_report_df_is_running_total_of_flows():
+    wires = create_wires(5_000)
+    interval = create_interval()
+
+    flows = services.Finrep(wires, ["sender"], interval).create_report_df().get_report_df()
+    actual = services.build_report_df(wires, ["sender"], interval, cumulative=True)
+    expected = flows.cumsum(axis=1).round(2)
+    expected = expected.loc[(expected != 0).any(axis=1), (expected != 0).any(axis=0)]
+    pd.testing.assert_frame_equal(actual, expected)
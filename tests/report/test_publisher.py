@@ -0,0 +1,319 @@
+from datetime import datetime
+
+import pandas as pd
+import pytest
+import pytz
+
+from src.report import domain, services
+from tests.report.test_finrep import create_wires, create_interval
+
+
+class FakeSheetGateway:
+    def __init__(self):
+        self.sheet = None
+        self.deltas = []
+        self.merged = []
+
+    async def update_sheet(self, data):
+        self.sheet = data
+
+    async def increment_cells(self, sheet_id, deltas):
+        self.deltas.extend(deltas)
+
+    async def merge_sheets(self, target_sheet_id, data, merge_on):
+        self.merged.append(data)
+        return data
+
+    async def get_row_of_cell(self, sheet_id, cell_id):
+        return next(row for row in self.sheet.table if any(x.id == cell_id for x in row))
+
+
+class FakeReportRepo:
+    def __init__(self):
+        self.updated = []
+        self.counts = []
+
+    async def update_one(self, data):
+        self.updated.append(data)
+
+    async def increment_plan_items(self, report_id, counts):
+        self.counts.append(counts)
+
+    async def get_one_by_id(self, uuid):
+        return self.report
+
+
+class FakeBroker:
+    def __init__(self):
+        self.pubs = []
+
+    async def subscribe(self, pubs, sub):
+        self.pubs.extend(pubs)
+
+
+def aggregate(wires: pd.DataFrame, ccols: list[str], interval: domain.Interval) -> pd.DataFrame:
+    # Mirrors SourceFullRepo.get_wire_aggregates
+    edges = pd.DatetimeIndex(interval.to_date_range())
+    wires = wires.loc[(wires["date"] > edges[0]) & (wires["date"] <= edges[-1])]
+    dates = edges[edges.searchsorted(wires["date"], side="left")]
+    grouped = wires.groupby([*[wires[x] for x in ccols], pd.Series(dates, index=wires.index, name="date")])
+    return grouped["amount"].agg(amount="sum", count="count").reset_index()
+
+
+def create_publisher(ccols: list[str], category: str = "PROFIT", interval: domain.Interval = None):
+    source_info = domain.SourceInfo(title="Source")
+    report = domain.Report(
+        title="Report",
+        category=category,
+        source_info=source_info,
+        sheet_info=domain.SheetInfo(id=source_info.id),
+        interval=interval or create_interval(),
+        plan_items=domain.PlanItems(ccols=ccols),
+    )
+    gateway = FakeSheetGateway()
+    broker = FakeBroker()
+    return services.ReportPublisher(report, FakeReportRepo(), gateway, broker), report, gateway, broker
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("start_date", [
+    datetime(2020, 12, 31, tzinfo=pytz.UTC),
+    datetime(2021, 1, 10, tzinfo=pytz.UTC),
+])
+async def test_follow_aggregates_builds_the_same_sheet_as_follow_source(start_date):
+    ccols = ["sender", "sub1"]
+    interval = create_interval().model_copy(update={"start_date": start_date})
+    wires = create_wires(2_000)
+    source_info = domain.SourceInfo(title="Source")
+    source = domain.Source(
+        source_info=source_info,
+        wires=[domain.Wire(**x, source_id=source_info.id) for x in wires.to_dict(orient="records")],
+    )
+
+    expected_pub, expected_report, expected_gw, _ = create_publisher(ccols, interval=interval)
+    await expected_pub.follow_source(source)
+
+    actual_pub, actual_report, actual_gw, broker = create_publisher(ccols, interval=interval)
+    await actual_pub.follow_aggregates(source_info, aggregate(wires, ccols, interval))
+
+    assert broker.pubs == [source_info]
+    assert actual_report.plan_items.uniques == expected_report.plan_items.uniques
+    assert list(actual_report.plan_items.order) == list(expected_report.plan_items.order)
+    assert actual_gw.sheet.size == expected_gw.sheet.size
+    for actual, expected in zip(actual_gw.sheet.cells, expected_gw.sheet.cells):
+        assert actual.value == expected.value
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("end_date", [
+    datetime(2021, 5, 31, tzinfo=pytz.UTC),
+    datetime(2020, 12, 31, tzinfo=pytz.UTC),
+    datetime(2020, 12, 1, tzinfo=pytz.UTC),
+])
+async def test_follow_builds_an_empty_sheet_without_wires(end_date):
+    ccols = ["sender", "sub1"]
+    interval = create_interval().model_copy(update={"end_date": end_date})
+    source_info = domain.SourceInfo(title="Source")
+
+    # An untyped frame, as a query without rows returns it
+    publisher, report, gateway, _ = create_publisher(ccols, interval=interval)
+    await publisher.follow_aggregates(source_info, pd.DataFrame(columns=[*ccols, "date", "amount", "count"]))
+    assert report.plan_items.uniques == {}
+    assert gateway.sheet.size[0] == 1
+
+    publisher, report, gateway, _ = create_publisher(ccols, interval=interval)
+    await publisher.follow_source(domain.Source(source_info=source_info, wires=[]))
+    assert report.plan_items.uniques == {}
+    assert gateway.sheet.size[0] == 1
+
+
+def create_source(wires: pd.DataFrame) -> domain.Source:
+    source_info = domain.SourceInfo(title="Source")
+    return domain.Source(
+        source_info=source_info,
+        wires=[domain.Wire(**x, source_id=source_info.id) for x in wires.to_dict(orient="records")],
+    )
+
+
+@pytest.mark.asyncio
+async def test_appended_wires_increment_indexed_cells():
+    source = create_source(create_wires(500))
+    publisher, report, gateway, _ = create_publisher(["sender", "sub1"])
+    await publisher.follow_source(source)
+
+    wires = source.wires[0:2]
+    wires[1] = wires[1].model_copy(update={"sender": wires[0].sender, "sub1": wires[0].sub1, "date": wires[0].date})
+    await publisher.on_wires_appended(services.WireDeltaCache.from_batch(domain.WireBatch.from_wires(wires)))
+
+    assert gateway.merged == []
+    assert len(gateway.deltas) == 1
+    row_id, col_id, delta = gateway.deltas[0]
+    key = report.plan_items.make_key([wires[0].sender, wires[0].sub1])
+    assert row_id == report.sheet_index.rows[key]
+    assert col_id in report.sheet_index.cols.values()
+    assert delta == round(wires[0].amount + wires[1].amount, 2)
+
+
+@pytest.mark.asyncio
+async def test_new_plan_item_falls_back_to_merge():
+    source = create_source(create_wires(500))
+    publisher, report, gateway, _ = create_publisher(["sender", "sub1"])
+    await publisher.follow_source(source)
+
+    wire = source.wires[0].model_copy(update={"sub1": "unknown"})
+    await publisher.on_wires_appended(services.WireDeltaCache.from_batch(domain.WireBatch.from_wires([wire])))
+
+    assert gateway.deltas == []
+    assert len(gateway.merged) == 1
+    assert report.plan_items.make_key([wire.sender, "unknown"]) in report.sheet_index.rows
+    assert publisher._repo.updated == [report]
+
+
+@pytest.mark.asyncio
+async def test_plan_items_follow_appended_and_deleted_wires():
+    source = create_source(create_wires(500))
+    publisher, report, gateway, _ = create_publisher(["sender", "sub1"])
+    await publisher.follow_source(source)
+
+    wire = next(x for x in source.wires if x.date.month == 2)
+    new = wire.model_copy(update={"sub1": "unknown"})
+    key = report.plan_items.make_key([new.sender, new.sub1])
+    await publisher.on_wires_appended(services.WireDeltaCache.from_batch(domain.WireBatch.from_wires([new, new])))
+    assert report.plan_items.uniques[key] == 2
+    assert report.find_row_pos(key) == report.plan_items.order.index(key)
+
+    await publisher.on_wires_deleted(services.WireDeltaCache.from_batch(domain.WireBatch.from_wires([new, new]),
+                                                                        sign=-1))
+    assert key not in report.plan_items.uniques
+    assert key not in report.plan_items.order
+    assert publisher._repo.counts == [{key: 2}, {key: -2}]
+
+
+@pytest.mark.asyncio
+async def test_wire_delta_cache_aggregates_once_per_ccols_and_interval():
+    source = create_source(create_wires(100))
+    cache = services.WireDeltaCache.from_batch(domain.WireBatch.from_wires(source.wires), sign=-1)
+
+    actual = await cache.get(["sender"], create_interval())
+    assert await cache.get(["sender"], create_interval()) is actual
+    assert await cache.get(["sender", "sub1"], create_interval()) is not actual
+    assert actual.to_numpy().sum() == pytest.approx(-sum(
+        x.amount for x in source.wires if create_interval().start_date < x.date <= create_interval().end_date
+    ), abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_update_of_ungrouped_field_is_skipped():
+    source = create_source(create_wires(500))
+    publisher, report, gateway, _ = create_publisher(["sender", "sub1"])
+    await publisher.follow_source(source)
+
+    old = domain.WireBatch.from_wires(source.wires[0:3])
+    new = domain.WireBatch.from_wires([x.model_copy(update={"sub2": "edited"}) for x in source.wires[0:3]])
+    await publisher.on_wires_updated(services.WireDeltaCache.from_update(old, new))
+
+    assert gateway.deltas == []
+    assert gateway.merged == []
+
+
+@pytest.mark.asyncio
+async def test_update_sends_net_delta():
+    source = create_source(create_wires(500))
+    publisher, report, gateway, _ = create_publisher(["sender"])
+    await publisher.follow_source(source)
+
+    wire = next(x for x in source.wires if x.date.month == 2 and x.date.day < 28)
+    old = domain.WireBatch.from_wires([wire])
+    new = domain.WireBatch.from_wires([wire.model_copy(update={"amount": wire.amount + 100})])
+    await publisher.on_wires_updated(services.WireDeltaCache.from_update(old, new))
+
+    row_id = report.sheet_index.rows[report.plan_items.make_key([wire.sender])]
+    assert gateway.deltas == [(row_id, gateway.deltas[0][1], 100.0)]
+
+
+@pytest.mark.asyncio
+async def test_consolidated_report_sums_members_and_follows_each():
+    ccols = ["sender", "sub1"]
+    interval = create_interval()
+    members = [domain.SourceInfo(title="First"), domain.SourceInfo(title="Second")]
+    wires = [create_wires(1_000, seed=1), create_wires(1_000, seed=2)]
+
+    expected_pub, _, expected_gw, _ = create_publisher(ccols)
+    await expected_pub.follow_aggregates(members[0], aggregate(pd.concat(wires), ccols, interval))
+
+    actual_pub, report, actual_gw, broker = create_publisher(ccols)
+    aggregates = pd.concat([aggregate(x, ccols, interval) for x in wires], ignore_index=True)
+    await actual_pub.follow_consolidated(members, aggregates)
+
+    assert broker.pubs == members
+    assert [[x.value for x in row] for row in actual_gw.sheet.table] == \
+           [[x.value for x in row] for row in expected_gw.sheet.table]
+
+    source = create_source(wires[1].iloc[0:1])
+    await actual_pub.on_wires_appended(services.WireDeltaCache.from_batch(domain.WireBatch.from_wires(source.wires)))
+    assert actual_gw.merged == []
+    assert [x[2] for x in actual_gw.deltas] == [round(source.wires[0].amount, 2)]
+
+
+@pytest.mark.asyncio
+async def test_cell_wire_filter_selects_the_wires_of_the_cell():
+    wires = create_wires(500)
+    publisher, report, gateway, _ = create_publisher(["sender", "sub1"])
+    await publisher.follow_source(create_source(wires))
+    publisher._repo.report = report
+    service = services.ReportService(publisher._repo, gateway, subfac=None)
+
+    row = gateway.sheet.table[1]
+    cell = next(x for x in row[2:] if x.value != 0)
+    filter_by = await service.get_cell_wire_filter(report.id, cell.id)
+
+    selected = wires.loc[
+        (wires["sender"] == filter_by["sender"]) & (wires["sub1"] == filter_by["sub1"])
+        & (wires["date"] > filter_by["date.__gt"]) & (wires["date"] <= filter_by["date.__lte"])
+    ]
+    assert filter_by["source_id.__in"] == [report.source_info.id]
+    assert round(selected["amount"].sum(), 2) == cell.value
+    assert filter_by["date.__lte"] == gateway.sheet.table[0][cell.col.position].value
+
+    with pytest.raises(LookupError):
+        await service.get_cell_wire_filter(report.id, gateway.sheet.table[0][0].id)
+
+
+@pytest.mark.asyncio
+async def test_cell_wire_filter_of_balance_starts_at_the_interval():
+    wires = create_wires(500)
+    publisher, report, gateway, _ = create_publisher(["sender", "sub1"], category="BALANCE")
+    await publisher.follow_source(create_source(wires))
+    publisher._repo.report = report
+    service = services.ReportService(publisher._repo, gateway, subfac=None)
+
+    row = gateway.sheet.table[1]
+    cell = row[-1]
+    filter_by = await service.get_cell_wire_filter(report.id, cell.id)
+
+    selected = wires.loc[
+        (wires["sender"] == filter_by["sender"]) & (wires["sub1"] == filter_by["sub1"])
+        & (wires["date"] > filter_by["date.__gt"]) & (wires["date"] <= filter_by["date.__lte"])
+    ]
+    bins = pd.DatetimeIndex(report.interval.to_date_range())
+    assert filter_by["date.__gt"] == bins[0]
+    assert filter_by["date.__lte"] == gateway.sheet.table[0][cell.col.position].value
+    assert round(selected["amount"].sum(), 2) == cell.value
+
+
+@pytest.mark.asyncio
+async def test_balance_append_adds_to_every_later_period():
+    source = create_source(create_wires(500))
+    publisher, report, gateway, _ = create_publisher(["sender"], category="BALANCE")
+    await publisher.follow_source(source)
+
+    wire = next(x for x in source.wires if x.date.month == 2 and x.date.day < 28)
+    wire = wire.model_copy(update={"amount": 100.0})
+    await publisher.on_wires_appended(services.WireDeltaCache.from_batch(domain.WireBatch.from_wires([wire])))
+
+    assert gateway.merged == []
+    periods = {v: k for k, v in report.sheet_index.cols.items()}
+    assert sorted(periods[x[1]] for x in gateway.deltas) == sorted(k for k in report.sheet_index.cols
+                                                                   if pd.Timestamp(k) >= wire.date)
+    row_id = report.sheet_index.rows[report.plan_items.make_key([wire.sender])]
+    assert all(x[0] == row_id and x[2] == 100.0 for x in gateway.deltas)
@@ -33,7 +33,7 @@ async def append_wires(source: domain.Source) -> domain.Source:
     ]
     async with db.get_async_session() as session:
         boot = bootstrap.Bootstrap(session)
-        await boot.get_source_service().append_wires(source.source_info, wires)
+        await boot.get_source_service().append_wires(source.source_info, domain.WireBatch.from_wires(wires))
         await session.commit()
 
     source = source.model_copy(deep=True)
@@ -72,6 +72,25 @@ async def test_append_wires():
         assert len(source.wires) == 5
 
 
+@pytest.mark.asyncio
+async def test_wire_pages_follow_cursor():
+    source = await create_source()
+    source = await append_wires(source)
+
+    pages = []
+    after = None
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        while True:
+            wires, after = await commands.GetWirePage(filter_by={"source_id": source.source_info.id}, after=after,
+                                                      limit=2, receiver=boot.get_source_service()).execute()
+            pages.append(wires)
+            if after is None:
+                break
+    assert [len(x) for x in pages] == [2, 2, 1]
+    assert [x.id for page in pages for x in page] == [x.id for x in source.wires]
+
+
 @pytest.mark.asyncio
 async def test_create_profit_report():
     source = await create_source()
@@ -147,11 +166,13 @@ async def test_report_sheet_reacts_on_wire_appended():
         boot = bootstrap.Bootstrap(session)
         bus = boot.get_event_bus()
 
-        cmd = commands.AppendWires(source_info=source.source_info, wires=[wire1, wire2, wire3,  wire4, wire5],
+        cmd = commands.AppendWires(source_info=source.source_info,
+                                   wires=domain.WireBatch.from_wires([wire1, wire2, wire3, wire4, wire5]),
                                    receiver=boot.get_source_service())
         await cmd.execute()
 
-        cmd = commands.DeleteWires(source_info=source.source_info, wires=[wire1], receiver=boot.get_source_service())
+        cmd = commands.DeleteWires(source_info=source.source_info, wires=domain.WireBatch.from_wires([wire1]),
+                                   receiver=boot.get_source_service())
         # await cmd.execute()
 
         updated = wire3.model_copy(deep=True)
@@ -167,3 +188,139 @@ async def test_report_sheet_reacts_on_wire_appended():
         sheet = await sheet_commands.GetSheetById(id=report.sheet_info.id,
                                                   receiver=boot.get_sheet_service()).execute()
         print("\n", pd.DataFrame(sheet.to_simple_frame("position")).to_string())
+
+
+@pytest.mark.asyncio
+async def test_wire_aggregates_follow_appended_and_deleted_wires():
+    source = await append_wires(await create_source())
+    midnight = domain.Interval(start_date=datetime(2020, 12, 31, tzinfo=pytz.UTC),
+                               end_date=datetime(2021, 5, 31, tzinfo=pytz.UTC),
+                               freq="1M")
+    shifted = domain.Interval(start_date=datetime(2020, 12, 31, 0, 0, 1, tzinfo=pytz.UTC),
+                              end_date=datetime(2021, 5, 31, 0, 0, 1, tzinfo=pytz.UTC),
+                              freq="1M")
+
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        await boot.get_source_service().delete_wires(source.source_info,
+                                                     domain.WireBatch.from_wires(source.wires[0:1]))
+        await session.commit()
+
+    async with db.get_async_session() as session:
+        service = bootstrap.Bootstrap(session).get_source_service()
+        actual = await service.get_wire_aggregates(source.source_info.id, ["sender", "sub1"], midnight)
+        expected = await service.get_wire_aggregates(source.source_info.id, ["sender", "sub1"], shifted)
+        assert actual['count'].sum() == 4
+        actual = actual.sort_values(["sender", "sub1"])
+        expected = expected.sort_values(["sender", "sub1"])
+        assert actual['amount'].tolist() == expected['amount'].tolist()
+
+
+@pytest.mark.asyncio
+async def test_plan_items_follow_appended_and_deleted_wires():
+    source = await append_wires(await create_source())
+
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        await boot.get_source_service().delete_wires(source.source_info,
+                                                     domain.WireBatch.from_wires(source.wires[0:1]))
+        await session.commit()
+
+    async with db.get_async_session() as session:
+        service = bootstrap.Bootstrap(session).get_source_service()
+        actual = await commands.GetPlanItems(source_id=source.source_info.id, receiver=service).execute()
+        assert [x.sender for x in actual] == [1, 2, 3, 4]
+        assert all(x.count == 1 and x.amount == 111 for x in actual)
+        actual = await commands.GetPlanItems(source_id=source.source_info.id, search="seco", receiver=service).execute()
+        assert [x.sender for x in actual] == [1, 3]
+
+
+@pytest.mark.asyncio
+async def test_source_stats_follow_appended_and_deleted_wires():
+    source = await append_wires(await create_source())
+
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        await boot.get_source_service().delete_wires(source.source_info,
+                                                     domain.WireBatch.from_wires(source.wires[0:1]))
+        await session.commit()
+
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        actual = await commands.GetSourceInfoById(id=source.source_info.id, receiver=boot.get_source_service()).execute()
+        assert actual.wire_count == 4
+        assert actual.total_amount == 444
+        assert actual.total_start_date == source.wires[1].date
+        assert actual.total_end_date == source.wires[4].date
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_and_reassign_update_sums():
+    source = await append_wires(await create_source())
+    wires = source.wires
+    interval = domain.Interval(start_date=datetime(2020, 12, 31, tzinfo=pytz.UTC),
+                               end_date=datetime(2021, 5, 31, tzinfo=pytz.UTC),
+                               freq="1M")
+
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        wire_filter = domain.WireFilter(source_id=source.source_info.id, sub1="second")
+        count = await commands.DeleteWiresBy(source_info=source.source_info, wire_filter=wire_filter,
+                                             receiver=boot.get_source_service()).execute()
+        await session.commit()
+        # Deleted wires come back grouped by key and full date, not summed per plan item
+        deleted = boot._queue.popleft().wires.to_frame().sort_values("date")
+        assert count == 2
+        assert deleted["date"].tolist() == [wires[1].date, wires[3].date]
+        assert deleted["sender"].tolist() == [1, 3]
+        assert deleted["count"].tolist() == [1, 1]
+        assert deleted["amount"].tolist() == [111, 111]
+
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        wire_filter = domain.WireFilter(source_id=source.source_info.id, sender=0)
+        count = await commands.UpdateWiresBy(source_info=source.source_info, wire_filter=wire_filter,
+                                             values=domain.WireAssignment(sender=2),
+                                             receiver=boot.get_source_service()).execute()
+        await session.commit()
+        event = boot._queue.popleft()
+        old, new = event.old_values.to_frame(), event.new_values.to_frame()
+        assert count == 1
+        assert old["sender"].tolist() == [0] and new["sender"].tolist() == [2]
+        assert old["date"].tolist() == new["date"].tolist() == [wires[0].date]
+        assert old["count"].tolist() == new["count"].tolist() == [1]
+
+    async with db.get_async_session() as session:
+        service = bootstrap.Bootstrap(session).get_source_service()
+        aggregates = await service.get_wire_aggregates(source.source_info.id, ["sender"], interval)
+        aggregates = aggregates.groupby("sender")[["amount", "count"]].sum()
+        assert aggregates.index.tolist() == [2, 4]
+        assert aggregates["count"].tolist() == [2, 1]
+        assert aggregates["amount"].tolist() == [222, 111]
+
+        plan_items = await commands.GetPlanItems(source_id=source.source_info.id, receiver=service).execute()
+        actual = sorted((x.sender, x.receiver, x.count, x.amount) for x in plan_items)
+        assert actual == [(2, 0, 1, 111), (2, 2, 1, 111), (4, 4, 1, 111)]
+
+        info = await commands.GetSourceInfoById(id=source.source_info.id, receiver=service).execute()
+        assert info.wire_count == 3
+        assert info.total_amount == 333
+        assert info.total_start_date == wires[0].date
+        assert info.total_end_date == wires[4].date
+
+
+@pytest.mark.asyncio
+async def test_report_list_returns_summaries():
+    source = await append_wires(await create_source())
+    interval = domain.Interval(start_date=datetime(2020, 12, 31, tzinfo=pytz.UTC),
+                               end_date=datetime(2021, 5, 31, tzinfo=pytz.UTC),
+                               freq="1M")
+    report = await create_report(source, interval)
+
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        actual = await commands.GetReportList(receiver=boot.get_report_service()).execute()
+        actual = next(x for x in actual if x.id == report.id)
+        assert isinstance(actual, domain.ReportSummary)
+        assert actual.sheet_info == report.sheet_info
+        assert actual.source_info.id == source.source_info.id
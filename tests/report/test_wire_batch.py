@@ -0,0 +1,181 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pandas as pd
+import pytest
+import pytz
+
+from src.base import eventbus
+from src.report import domain, services
+
+
+def test_from_frame_casts_columns_and_fills_defaults():
+    source_id = uuid4()
+    frame = pd.DataFrame({
+        "date": ["2021-01-15", "2021-02-15"],
+        "sender": ["1", 2],
+        "receiver": [3, 4],
+        "amount": [10, -5.5],
+        "sub1": ["first", None],
+    })
+    batch = domain.WireBatch.from_frame(frame, source_id=source_id)
+
+    actual = batch.to_frame()
+    assert list(actual.columns) == [*domain.WireBatch.columns, "count"]
+    assert actual["sender"].tolist() == [1.0, 2.0]
+    assert actual["sub1"].tolist() == ["first", ""]
+    assert actual["sub2"].tolist() == ["", ""]
+    assert str(actual["date"].dt.tz) == "UTC"
+    assert len(set(batch.ids)) == 2
+    assert all(x == source_id for x in actual["source_id"])
+
+
+def test_from_frame_rejects_missing_and_empty_values():
+    with pytest.raises(ValueError):
+        domain.WireBatch.from_frame(pd.DataFrame({"date": ["2021-01-15"], "sender": [1], "receiver": [1]}),
+                                    source_id=uuid4())
+    with pytest.raises(ValueError):
+        domain.WireBatch.from_frame(pd.DataFrame({"date": ["2021-01-15"], "sender": [1], "receiver": [None],
+                                                  "amount": [1]}), source_id=uuid4())
+    with pytest.raises(ValueError):
+        domain.WireBatch.from_frame(pd.DataFrame({"date": ["2021-01-15"], "sender": ["x"], "receiver": [1],
+                                                  "amount": [1]}), source_id=uuid4())
+
+
+def test_to_rows_round_trips_wires():
+    wire = domain.Wire(date=datetime(2021, 1, 15, tzinfo=pytz.UTC), sender=1, receiver=2, amount=3.5,
+                       sub1="first", source_id=uuid4())
+    rows = domain.WireBatch.from_wires([wire]).to_rows()
+    assert [domain.Wire(**dict(zip(domain.WireBatch.columns, x))) for x in rows] == [wire]
+    assert type(rows[0][1]) is datetime
+
+
+def test_wire_cursor_round_trips():
+    cursor = domain.WireCursor(date=datetime(2021, 1, 15, tzinfo=pytz.UTC), id=uuid4())
+    assert domain.WireCursor.decode(cursor.encode()) == cursor
+    with pytest.raises(ValueError):
+        domain.WireCursor.decode("not a cursor")
+
+
+class FakeSourceRepo:
+    def __init__(self):
+        self.added = []
+        self.aggregated = []
+
+    async def add_wires(self, wires):
+        self.added.append(len(wires))
+
+    async def increment_wire_aggregates(self, wires, sign=1):
+        self.aggregated.append(len(wires) * sign)
+
+    async def update_wires_by(self, wire_filter, values):
+        frame = pd.DataFrame({"date": ["2021-01-15"], "sender": [1], "receiver": [2], "amount": [15.0], "count": [2]})
+        old = domain.WireBatch.from_frame(frame, source_id=wire_filter.source_id)
+        return old, domain.WireBatch.from_frame(frame.assign(**values.to_values()), source_id=wire_filter.source_id)
+
+
+def create_chunks(source_info: domain.SourceInfo, size: int):
+    frame = pd.DataFrame({
+        "date": ["2021-01-15", "2021-01-15", "2021-01-16"],
+        "sender": [1, 1, 1],
+        "receiver": [2, 2, 2],
+        "amount": [10.0, 5.0, 1.0],
+    })
+    return (domain.WireBatch.from_frame(frame, source_id=source_info.id) for _ in range(size))
+
+
+@pytest.mark.asyncio
+async def test_append_wire_chunks_publishes_summed_wires_once():
+    source_info = domain.SourceInfo(title="Source")
+    queue = eventbus.Queue()
+    repo = FakeSourceRepo()
+    service = services.SourceService(repo, queue)
+
+    progress = [x async for x in service.append_wire_chunks(source_info, create_chunks(source_info, 3))]
+
+    assert progress == [3, 6, 9]
+    assert repo.added == repo.aggregated == [3, 3, 3]
+    event = queue.popleft()
+    assert queue.empty
+    actual = event.wires.to_frame().sort_values("date")
+    assert actual["amount"].tolist() == [45.0, 3.0]
+    assert actual["count"].tolist() == [6, 3]
+
+
+@pytest.mark.asyncio
+async def test_append_wire_chunks_flushes_when_row_budget_is_reached(monkeypatch):
+    monkeypatch.setattr(services.WireAccumulator, "max_rows", 2)
+    source_info = domain.SourceInfo(title="Source")
+    queue = eventbus.Queue()
+    service = services.SourceService(FakeSourceRepo(), queue)
+
+    progress = [x async for x in service.append_wire_chunks(source_info, create_chunks(source_info, 3))]
+
+    assert progress == [3, 6, 9]
+    batches = []
+    while not queue.empty:
+        batches.append(queue.popleft().wires.to_frame().sort_values("date"))
+    assert len(batches) == 3
+    for actual in batches:
+        assert actual["amount"].tolist() == [15.0, 1.0]
+        assert actual["count"].tolist() == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_append_wire_chunks_keeps_queued_wires_bounded(monkeypatch):
+    monkeypatch.setattr(services.WireAccumulator, "max_rows", 10)
+    source_info = domain.SourceInfo(title="Source")
+    dates = pd.date_range("2021-01-01", periods=1_000, freq="h", tz="UTC")
+    chunks = (
+        domain.WireBatch.from_frame(pd.DataFrame({"date": dates[i:i + 4], "sender": 1, "receiver": 2, "amount": 1.0}),
+                                    source_id=source_info.id)
+        for i in range(0, len(dates), 4)
+    )
+    queue = eventbus.Queue()
+    service = services.SourceService(FakeSourceRepo(), queue)
+
+    # Drains the queue after every yield, the way the upload routers run the event bus
+    sizes = []
+    async for _ in service.append_wire_chunks(source_info, chunks):
+        events = []
+        while not queue.empty:
+            events.append(queue.popleft())
+        sizes.append((len(events), sum(len(x.wires) for x in events)))
+    while not queue.empty:
+        sizes.append((1, len(queue.popleft().wires)))
+
+    assert max(x[0] for x in sizes) == 1
+    assert max(x[1] for x in sizes) <= 10 + 4
+    assert sum(x[1] for x in sizes) == len(dates)
+
+
+@pytest.mark.asyncio
+async def test_update_wires_by_moves_summed_wires():
+    source_info = domain.SourceInfo(title="Source")
+    queue = eventbus.Queue()
+    repo = FakeSourceRepo()
+    service = services.SourceService(repo, queue)
+    wire_filter = domain.WireFilter(source_id=source_info.id, sender=1)
+
+    assert await service.update_wires_by(source_info, wire_filter, domain.WireAssignment()) == 0
+    assert queue.empty
+
+    count = await service.update_wires_by(source_info, wire_filter, domain.WireAssignment(receiver=3))
+    assert count == 2
+    assert repo.aggregated == [-1, 1]
+    event = queue.popleft()
+    assert event.old_values.to_frame()["receiver"].tolist() == [2.0]
+    assert event.new_values.to_frame()["receiver"].tolist() == [3.0]
+
+
+def test_wire_dictionary_keeps_codes_of_known_values():
+    dictionary = domain.WireDictionary({1.0: 0})
+
+    codes, added = dictionary.encode(pd.Series([2.0, 1.0, 3.0, 2.0]))
+    assert codes.tolist() == [1, 0, 2, 1]
+    assert added == {2.0: 1, 3.0: 2}
+
+    codes, added = dictionary.encode(pd.Series([3.0, 1.0]))
+    assert codes.tolist() == [2, 0]
+    assert added == {}
+    assert dictionary.codes == {1.0: 0, 2.0: 1, 3.0: 2}
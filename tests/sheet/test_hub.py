@@ -0,0 +1,40 @@
+import pytest
+
+from src.sheet import domain, services
+from src.sheet.infrastructure import hub
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.messages = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message: str):
+        self.messages.append(message)
+
+
+@pytest.mark.asyncio
+async def test_hub_sends_one_patch_per_sheet_to_its_listeners():
+    sheet1 = domain.Sheet.from_table([[1, 2]])
+    sheet2 = domain.Sheet.from_table([[3, 4]])
+    cascade = services.Cascade()
+    cascade.add_cells(sheet1.cells + sheet2.cells)
+
+    sheet_hub = hub.SheetHub()
+    listener1 = FakeWebSocket()
+    listener2 = FakeWebSocket()
+    await sheet_hub.connect(sheet1.sf.id, listener1)
+    await sheet_hub.connect(sheet2.sf.id, listener2)
+    await sheet_hub.publish(cascade)
+
+    assert len(listener1.messages) == 1
+    assert len(listener2.messages) == 1
+    assert str(sheet1.cells[0].id) in listener1.messages[0]
+    assert str(sheet2.cells[0].id) not in listener1.messages[0]
+
+    sheet_hub.disconnect(sheet1.sf.id, listener1)
+    await sheet_hub.publish(cascade)
+    assert len(listener1.messages) == 1
+    assert len(listener2.messages) == 2
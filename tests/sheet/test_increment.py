@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+
+import db
+from src.sheet import domain, bootstrap, commands
+
+
+@pytest.mark.asyncio
+async def create_sheet(sheet: domain.Sheet):
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        cmd = commands.CreateSheet(data=sheet, receiver=boot.get_sheet_service())
+        result = await cmd.execute()
+        await session.commit()
+        return result
+
+
+@pytest.mark.asyncio
+async def test_fractional_increments_match_a_rebuild():
+    amounts = [[0.1, 0.2], [0.7, 0.01], [-0.33, 1.15], [0.1, 0.1], [0.2, -0.07]]
+    sheet = await create_sheet(domain.Sheet.from_table([[0.0, 1.05]]))
+
+    for batch in amounts:
+        async with db.get_async_session() as session:
+            boot = bootstrap.Bootstrap(session)
+            deltas = [(sheet.rows[0].id, sheet.cols[j].id, x) for j, x in enumerate(batch)]
+            await boot.get_sheet_service().increment_cells(sheet.sf.id, deltas)
+            await session.commit()
+
+    # A rebuild sums every amount at once and rounds the way the report does
+    rebuilt = (pd.DataFrame(amounts).sum() + pd.Series([0.0, 1.05])).round(2).tolist()
+
+    async with db.get_async_session() as session:
+        boot = bootstrap.Bootstrap(session)
+        actual = await boot.get_sheet_service().get_sheet_by_id(sheet.sf.id)
+    assert [x.value for x in actual.cells] == rebuilt
+    assert [str(x.value) for x in actual.cells] == [str(x) for x in rebuilt]
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+from src.sheet import domain, services
+from src.sheet.infrastructure import schema
+
+
+def test_cascade_schema_is_keyed_by_cell_id():
+    sheet = domain.Sheet.from_table([[1, 2], [3, 4]])
+    formula = domain.Sum(cell_id=sheet.cells[3].id, value=3)
+    cascade = services.Cascade()
+    cascade.add_cells(sheet.cells[0:2])
+    cascade.add_cells([sheet.cells[3]])
+    cascade.add_formulas([formula])
+
+    actual = schema.CascadeSchema.from_cascade(cascade)
+    assert set(actual.cells.keys()) == {sheet.cells[0].id, sheet.cells[1].id, sheet.cells[3].id}
+    assert actual.cells[sheet.cells[3].id].value == "4"
+    assert actual.cells[sheet.cells[3].id].dtype == "int"
+    assert actual.formulas[sheet.cells[3].id]["value"] == 3
+
+
+def test_columnar_sheet_schema():
+    sheet = domain.Sheet.from_table([
+        [None, datetime(2021, 1, 1)],
+        ["Revenue", 100.5],
+    ], freeze_rows=1, freeze_cols=1)
+    sheet.table[0][0].background = "#F8FAFDFF"
+
+    actual = schema.ColumnarSheetSchema.from_sheet(sheet)
+    assert [x["id"] for x in actual["rows"]] == [str(x.id) for x in sheet.rows]
+    assert actual["rows"][0]["is_freeze"] is True
+    assert actual["cells"]["ids"] == [str(x.id) for x in sheet.cells]
+    assert actual["cells"]["values"] == [None, "2021-01-01T00:00:00", "Revenue", 100.5]
+    assert actual["cells"]["dtypes"] == ["string", "datetime", "string", "float"]
+    assert actual["cells"]["styles"] == [0, 1, 1, 1]
+    assert actual["styles"] == [
+        {"background": "#F8FAFDFF", "is_readonly": False},
+        {"background": "white", "is_readonly": False},
+    ]
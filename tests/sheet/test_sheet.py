@@ -1,5 +1,8 @@
 from datetime import datetime
 
+import pytest
+
+from src.base.executor import ProcessExecutor
 from src.sheet import domain
 from src.helpers.arrays import flatten
 
@@ -123,6 +126,30 @@ def test_complex_merge():
     assert str(actual) == str(expected)
 
 
+
+@pytest.mark.asyncio
+async def test_merge_sheets_in_a_spawned_process():
+    target = domain.Sheet.from_table([
+        [None, datetime(2021, 1, 1), datetime(2022, 1, 1)],
+        ["first", 10, 10],
+    ])
+    data = domain.Sheet.from_table([
+        [None, datetime(2021, 1, 1), datetime(2022, 1, 1)],
+        ["first", 20, 20],
+        ["new_row", 5, 5],
+    ])
+    executor = ProcessExecutor(max_workers=1)
+    try:
+        merged, diff = await executor.run(domain.merge_sheets, target, data, [0], [0])
+    finally:
+        executor.shutdown()
+
+    assert merged.size == (3, 3)
+    assert [[x.value for x in row] for row in merged.table[1:]] == [["first", 30, 30], ["new_row", 5, 5]]
+    assert len(diff.rows_created) == 1
+    assert len(diff.cells_created) == 3
+    assert {x.value for x in diff.cells_updated} == {30}
+
 def test_update_diff():
     sheet1 = domain.Sheet.from_table([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
     target = (